@@ -1,46 +1,49 @@
 # --- 1. Librerías necesarias ---
 # Estas son herramientas que necesitamos para que el programa funcione
 
-import math  # Contiene funciones matemáticas como seno, coseno, raíz cuadrada, etc.
 import numpy as np  # Nos ayuda a trabajar con listas de números de manera eficiente
-import matplotlib.pyplot as plt  # Nos permite crear gráficas para visualizar los resultados
 import sys  # Nos da herramientas del sistema, como poder parar el programa
+from motor_expresiones import compilar_expresion, version_escalar  # Conversor seguro de fórmulas (compartido)
+from instrumentacion import contar, fase  # Contadores y cronómetros opcionales (ver instrumentacion.py)
+from richardson import extrapolar  # Extrapolación de Richardson (compartida con RK4)
+from graficas import indices_reducidos, mostrar_o_guardar, nueva_figura  # Gráficas grandes y sin pantalla
 
 
 # --- 2. Conversor seguro de ecuaciones ---
 # Esta sección convierte las fórmulas que escribes en funciones que la computadora puede usar
 
-# Creamos una lista de operaciones matemáticas permitidas para mantener seguridad
-# Solo permitimos cálculos matemáticos, nada que pueda dañar el sistema
-ALLOWED_FUNCTIONS = {
-    k: v for k, v in math.__dict__.items() if not k.startswith('_')
-}
-ALLOWED_FUNCTIONS['abs'] = abs  # Añadimos la función de valor absoluto
-ALLOWED_FUNCTIONS['pow'] = pow  # Añadimos la función de potencias
-ALLOWED_FUNCTIONS['math'] = math  # Añadimos el módulo math completo para usar math.sin(), math.cos(), etc.
+# Usamos el motor de expresiones compartido con los otros métodos: revisa que la
+# fórmula solo tenga operaciones matemáticas (nada que pueda dañar el sistema),
+# la compila una sola vez y recuerda las fórmulas que ya vio.
 
-def create_function(expr_str, var_names):
+def create_function(expr_str, var_names, instrumentacion=None, vectorial=False):
     """
     Convierte un texto como "x**2" en una función que la computadora puede usar.
     Es como crear una calculadora personalizada según la fórmula que escribiste.
+    Si se pasa una Instrumentacion, mide el tiempo de esta conversión ('parsear').
+    Con vectorial=True la función acepta arreglos de numpy completos (se usa
+    para la solución analítica, que se evalúa en todos los puntos de una vez).
     """
     try:
         # Intentamos crear la función paso a paso
         
-        # Convertimos tu texto en una función matemática real
-        # Usamos medidas de seguridad para evitar comandos peligrosos:
-        # - Bloqueamos acceso a funciones del sistema que podrían ser peligrosas
-        # - Solo permitimos las operaciones matemáticas de nuestra lista segura
-        func = eval(
-            f"lambda {','.join(var_names)}: {expr_str}",
-            ALLOWED_FUNCTIONS,  # Namespace global con funciones matemáticas
-            {"__builtins__": {}}  # Namespace local vacío para seguridad
-        )
+        # Convertimos tu texto en una función matemática real.
+        # La versión "escalar" (con el módulo math) es la más rápida para calcular
+        # un valor a la vez como hace el método de Euler; la "vectorial" (con numpy)
+        # calcula muchos valores de una sola vez
+        with fase(instrumentacion, 'parsear'):
+            compilada = compilar_expresion(expr_str, tuple(var_names))
+        func = compilada.vectorial if vectorial else compilada.escalar
         
         # Probamos la función con números sencillos para verificar que funciona
         # Es como probar una máquina nueva antes de usarla en serio
         test_args = [1] * len(var_names)
-        func(*test_args)
+        try:
+            func(*test_args)
+        except (TypeError, IndexError):
+            # Puede ser un sistema de ecuaciones como "[y[1], -y[0]]",
+            # así que lo probamos también con un vector de unos
+            func(*test_args[:-1], np.ones(10))
         
         # Si llegamos aquí, la función se creó correctamente
         return func
@@ -67,6 +70,19 @@ def get_numerical_input(prompt):
             # Si la conversión falla (porque escribió letras), pide intentar otra vez
             print("Por favor ingresa un número válido (ejemplo: 5, 3.14, -2.5)")
 
+def get_vector_input(prompt):
+    """
+    Igual que get_numerical_input, pero acepta varios números separados por comas
+    (por ejemplo "1, 0") para las condiciones iniciales de un sistema de ecuaciones.
+    Devuelve un número si solo se escribió uno, o un arreglo de numpy si hay varios.
+    """
+    while True:
+        try:
+            valores = [float(v) for v in input(prompt).split(',')]
+            return valores[0] if len(valores) == 1 else np.array(valores)
+        except ValueError:
+            print("Por favor ingresa uno o varios números separados por comas (ejemplo: 1, 0)")
+
 def get_user_input():
     """
     Recopila toda la información necesaria del usuario para resolver el problema.
@@ -78,7 +94,8 @@ def get_user_input():
     print("  SOLUCIONADOR DE ECUACIONES DIFERENCIALES  ")
     print("="*50)
     print("Puedes usar funciones como: math.sin, math.cos, math.sqrt, math.pi, etc.")
-    print("Para potencias usa **: por ejemplo x**2 significa x al cuadrado\n")
+    print("Para potencias usa ** o ^: por ejemplo x**2 significa x al cuadrado")
+    print("Para sistemas usa una lista con y[0], y[1], ...: por ejemplo [y[1], -y[0]]\n")
 
     # 1. Obtiene la ecuación diferencial del usuario
     # Esta ecuación describe cómo cambia y con respecto a x
@@ -89,7 +106,7 @@ def get_user_input():
         
     # 2. Obtiene las condiciones iniciales y parámetros del método
     x0 = get_numerical_input("Introduce el valor inicial x0:      ")
-    y0 = get_numerical_input("Introduce el valor inicial y0 (y(x0)): ")
+    y0 = get_vector_input("Introduce el valor inicial y0 (y(x0)): ")
     h = get_numerical_input("Introduce el tamaño de paso (h):     ")
     x_final = get_numerical_input("Introduce el valor final de x:       ")
     
@@ -99,17 +116,31 @@ def get_user_input():
     if has_analitica == 's':
         while g_func is None: # Continúa hasta que la solución sea válida
             g_str = input("Introduce la solución g(x) =       ")
-            g_func = create_function(g_str, ['x']) # Convierte el texto en función
+            g_func = create_function(g_str, ['x'], vectorial=True) # Función que acepta arreglos
     
     # Devuelve todos los datos recopilados para que el programa los use
     return f_func, g_func, x0, y0, h, x_final
 
 # --- 4. Implementación del Método de Euler ---
 
-def metodo_euler(f, x0, y0, h, x_final):
+def formatear_y(y):
     """
-    Implementa el método numérico de Euler para resolver la ecuación diferencial.
-    Calcula paso a paso los valores aproximados y muestra una tabla con los resultados.
+    Da formato a un valor de y para la tabla: un número normal,
+    o una lista de números si estamos resolviendo un sistema de ecuaciones.
+    """
+    if np.ndim(y) == 0:
+        return f"{y:<18.6f}"
+    return "[" + ", ".join(f"{v:.6f}" for v in y) + "]"
+
+def pasos_euler(f, x0, y0, h, x_final, tam_bloque=4096, store_every=1, por_paso=None):
+    """
+    Versión "en flujo" del método de Euler: en lugar de imprimir o guardar todo,
+    va entregando los resultados por bloques (x_bloque, y_bloque) de hasta
+    `tam_bloque` puntos. Así se pueden procesar millones de pasos sin tenerlos
+    todos en memoria ni imprimirlos. El primer bloque incluye el punto inicial.
+    Con store_every=k se integra con el mismo h pero solo se entrega uno de
+    cada k puntos (el último punto siempre se entrega).
+    Si se da `por_paso`, se llama como por_paso(paso, x, y) después de cada paso.
     """
     
     # Calcula cuántos pasos necesitamos para llegar desde x0 hasta x_final
@@ -117,97 +148,379 @@ def metodo_euler(f, x0, y0, h, x_final):
     
     if n_pasos == 0 and x0 != x_final:
         print("Error: El tamaño de paso 'h' es demasiado grande.")
-        return [], [] # Devuelve listas vacías para indicar error
-        
-    # Crea listas para guardar todos los valores de x e y que vamos calculando
-    x_valores = [0.0] * (n_pasos + 1)
-    y_valores = [0.0] * (n_pasos + 1)
-    
-    # Guarda el punto inicial (el punto de partida que nos dio el usuario)
-    x_valores[0] = x0
-    y_valores[0] = y0
-    
-    # Muestra el encabezado de la tabla donde veremos todos los resultados
-    print("\n--- Calculando con Método de Euler ---")
-    print("--------------------------------------")
-    print(f"| {'Paso':<4} | {'x':<10} | {'y (aprox)':<18} |")
-    print("--------------------------------------")
-    print(f"| {0:<4} | {x0:<10.4f} | {y0:<18.6f} |")
+        return # No entrega ningún bloque para indicar error
 
-    # Aplicamos la fórmula de Euler para cada paso
-    for i in range(n_pasos):
-        x_i = x_valores[i] # Valor actual de x
-        y_i = y_valores[i] # Valor actual de y
-        
+    # Para sistemas cada fila de y es un vector de n valores
+    es_sistema = np.ndim(y0) > 0
+    forma = (np.size(y0),) if es_sistema else ()
+    if es_sistema:
+        y_i = np.array(y0, dtype=float)
+        incremento = np.empty(forma)  # Espacio reutilizable para h * f(x, y)
+    else:
+        y_i = y0
+
+    # Cuántos puntos vamos a entregar en total (para reservar bloques justos)
+    pendientes = n_pasos // store_every + 1 + (1 if n_pasos % store_every else 0)
+
+    def nuevo_bloque():
+        m = min(tam_bloque, pendientes)
+        return np.empty(m), np.empty((m,) + forma)
+
+    x_bloque, y_bloque = nuevo_bloque()
+    x_bloque[0] = x0
+    y_bloque[0] = y_i
+    j = 1 # Posición libre dentro del bloque actual
+    pendientes -= 1
+    ultimo_guardado = 0
+
+    for p in range(1, n_pasos + 1):
         # Fórmula de Euler: y_nuevo = y_actual + h * f(x_actual, y_actual)
         # donde f(x,y) es nuestra ecuación diferencial
+        x_i = x0 + (p - 1) * h
         try:
-            # 1. Calcula la pendiente (derivada) en el punto actual usando nuestra ecuación
+            # Calcula la pendiente (derivada) en el punto actual usando nuestra ecuación
             pendiente = f(x_i, y_i)
         except (ValueError, ZeroDivisionError) as e:
             # Si hay un error matemático (como dividir por cero), para el cálculo
-            print(f"¡Error en el paso {i+1}! No se puede calcular f({x_i}, {y_i}). Detalle: {e}")
+            print(f"¡Error en el paso {p}! No se puede calcular f({x_i}, {y_i}). Detalle: {e}")
             print("El cálculo se detendrá.")
-            return x_valores[:i+1], y_valores[:i+1] # Devuelve lo que calculó hasta ahora
-            
-        # 2. Calcula el siguiente valor de y usando la fórmula de Euler
-        y_siguiente = y_i + h * pendiente 
-        
-        # 3. Guarda los nuevos valores en nuestras listas
-        # Calculamos x de esta forma para evitar errores de redondeo acumulados
-        x_valores[i+1] = x0 + (i + 1) * h 
-        y_valores[i+1] = y_siguiente
-        
-        # Muestra esta fila en la tabla de resultados
-        print(f"| {i+1:<4} | {x_valores[i+1]:<10.4f} | {y_siguiente:<18.6f} |")
-        
+            if ultimo_guardado != p - 1:
+                # Entregamos también el último punto bueno aunque no toque guardarlo
+                if j == len(x_bloque):
+                    yield x_bloque, y_bloque
+                    x_bloque, y_bloque, j = np.empty(1), np.empty((1,) + forma), 0
+                x_bloque[j] = x_i
+                y_bloque[j] = y_i
+                j += 1
+            yield x_bloque[:j], y_bloque[:j] # Entrega lo que calculó hasta ahora
+            return
+
+        if es_sistema:
+            # Actualizamos y en su lugar, sin crear vectores nuevos
+            np.multiply(pendiente, h, out=incremento)
+            y_i += incremento
+        else:
+            y_i = y_i + h * pendiente
+
+        if por_paso is not None:
+            por_paso(p, x0 + p * h, y_i)
+
+        if p % store_every == 0 or p == n_pasos:
+            if j == len(x_bloque):
+                yield x_bloque, y_bloque
+                x_bloque, y_bloque = nuevo_bloque()
+                j = 0
+            # Calculamos x de esta forma para evitar errores de redondeo acumulados
+            x_bloque[j] = x0 + p * h
+            y_bloque[j] = y_i
+            j += 1
+            pendientes -= 1
+            ultimo_guardado = p
+
+    yield x_bloque[:j], y_bloque[:j]
+
+def imprimir_tabla(bloques, cada=1, x0=None, h=None):
+    """
+    Muestra la tabla de resultados mientras los bloques pasan por aquí.
+    Con `cada=k` solo imprime una de cada k filas (más la última), para no
+    llenar la pantalla. Devuelve los mismos bloques, así que se puede encadenar
+    con otros consumidores (por ejemplo guardar_csv).
+    Si se dan x0 y h, el número de paso se calcula a partir de x (útil cuando
+    los bloques vienen con store_every y no traen todos los pasos).
+    """
+    # Muestra el encabezado de la tabla donde veremos todos los resultados
+    print("\n--- Calculando con Método de Euler ---")
+    print("--------------------------------------")
+    print(f"| {'Paso':<4} | {'x':<10} | {'y (aprox)':<18} |")
     print("--------------------------------------")
-    print("Cálculo completado.")
+
+    def imprimir_fila(paso, x, y):
+        n = paso if h is None else int(round((x - x0) / h))
+        print(f"| {n:<4} | {x:<10.4f} | {formatear_y(y)} |")
+
+    paso = 0 # Número de fila global (no se reinicia en cada bloque)
+    ultima = None # Última fila vista, por si no le tocó imprimirse
+    for x_bloque, y_bloque in bloques:
+        for j in range(len(x_bloque)):
+            if paso % cada == 0:
+                # Muestra esta fila en la tabla de resultados
+                imprimir_fila(paso, x_bloque[j], y_bloque[j])
+            paso += 1
+        if len(x_bloque):
+            ultima = (paso - 1, x_bloque[-1], y_bloque[-1])
+        yield x_bloque, y_bloque
+
+    # La última fila del último bloque siempre se muestra
+    if ultima is not None and ultima[0] % cada != 0:
+        imprimir_fila(*ultima)
+    print("--------------------------------------")
+
+def guardar_csv(bloques, ruta):
+    """
+    Escribe los bloques en un archivo CSV (columnas x, y o x, y0, y1, ...)
+    a medida que llegan, sin juntar primero todos los resultados en memoria.
+    Devuelve cuántas filas se escribieron.
+    """
+    filas = 0
+    with open(ruta, 'w') as archivo:
+        for x_bloque, y_bloque in bloques:
+            datos = np.column_stack([x_bloque, y_bloque])
+            if filas == 0:
+                # El encabezado depende de si es una ecuación o un sistema
+                n_y = datos.shape[1] - 1
+                encabezado = ['x'] + (['y'] if n_y == 1 else [f'y{k}' for k in range(n_y)])
+                archivo.write(','.join(encabezado) + '\n')
+            np.savetxt(archivo, datos, delimiter=',', fmt='%.17g')
+            filas += len(x_bloque)
+    return filas
+
+def guardar_binario(bloques, ruta):
+    """
+    Igual que guardar_csv pero en binario (float64 sin encabezado, una fila
+    [x, y...] tras otra). Es mucho más compacto y rápido de escribir;
+    se lee con np.fromfile(ruta).reshape(-1, n_columnas).
+    Devuelve cuántas filas se escribieron.
+    """
+    filas = 0
+    with open(ruta, 'wb') as archivo:
+        for x_bloque, y_bloque in bloques:
+            np.column_stack([x_bloque, y_bloque]).astype(np.float64).tofile(archivo)
+            filas += len(x_bloque)
+    return filas
+
+def metodo_euler(f, x0, y0, h, x_final, mostrar_tabla=True, imprimir_cada=1, store_every=1,
+                 instrumentacion=None):
+    """
+    Implementa el método numérico de Euler para resolver la ecuación diferencial.
+    Calcula paso a paso los valores aproximados y muestra una tabla con los resultados.
+    Si y0 es un vector, resuelve un sistema: f(x, y) debe devolver un vector
+    del mismo tamaño y los valores de y se guardan en un arreglo (pasos+1, n).
+    Con mostrar_tabla=False no imprime nada por paso; con imprimir_cada=k
+    solo muestra una de cada k filas.
+    Los resultados se guardan en arreglos de numpy (float64) reservados de
+    antemano; con store_every=k solo se guarda uno de cada k puntos, aunque
+    se sigue integrando con el h pequeño.
+    Con una Instrumentacion se cuentan las evaluaciones de f, se mide la fase
+    'integrar' y se llama a su función por_paso en cada paso.
+    """
+    n_pasos = int(round(abs(x_final - x0) / h))
+    f = contar(instrumentacion, f, 'f')
+    por_paso = instrumentacion.por_paso if instrumentacion is not None else None
+    bloques = pasos_euler(f, x0, y0, h, x_final, store_every=store_every, por_paso=por_paso)
+    if mostrar_tabla:
+        bloques = imprimir_tabla(bloques, cada=imprimir_cada, x0=x0, h=h)
+
+    # Reserva de una vez los arreglos para todos los puntos que se van a guardar
+    total = n_pasos // store_every + 1 + (1 if n_pasos % store_every else 0)
+    x_valores = np.empty(total)
+    y_valores = np.empty((total,) + np.shape(y0))
+
+    # Copia cada bloque en su lugar dentro de los arreglos de resultados
+    guardados = 0
+    with fase(instrumentacion, 'integrar'):
+        for x_bloque, y_bloque in bloques:
+            m = len(x_bloque)
+            x_valores[guardados:guardados + m] = x_bloque
+            y_valores[guardados:guardados + m] = y_bloque
+            guardados += m
+
+    if guardados == 0:
+        return np.empty(0), np.empty(0) # Devuelve arreglos vacíos para indicar error
+
+    # Solo decimos que terminó si llegamos hasta x_final sin errores
+    if mostrar_tabla and guardados == total:
+        print("Cálculo completado.")
     
-    # Devuelve todas las listas con los valores calculados
+    # Devuelve los arreglos con los valores calculados (recortados si hubo un error)
+    return x_valores[:guardados], y_valores[:guardados]
+
+def metodo_euler_richardson(f, x0, y0, h, x_final, niveles=3, instrumentacion=None):
+    """
+    Extrapolación de Richardson sobre el método de Euler: resuelve con h, h/2,
+    h/4, ... (`niveles` corridas) y combina los resultados en los puntos de la
+    malla de paso h. Con 3 niveles se obtiene un resultado de orden 3 usando
+    solo corridas baratas de Euler, sin que el usuario elija millones de pasos.
+    Devuelve (x, y, error_estimado); arreglos vacíos si alguna corrida falla.
+    """
+    n_pasos = int(round(abs(x_final - x0) / h))
+    aproximaciones = []
+    x_valores = None
+    for k in range(niveles):
+        # La corrida con h/2^k solo guarda uno de cada 2^k puntos: los de la malla de paso h
+        x_k, y_k = metodo_euler(f, x0, y0, h / 2**k, x_final, mostrar_tabla=False,
+                                store_every=2**k, instrumentacion=instrumentacion)
+        if len(x_k) != n_pasos + 1:
+            # Falló la corrida o (x_final - x0) no es múltiplo de h y las mallas no coinciden
+            print("Error: no se pudo completar la extrapolación de Richardson.")
+            return np.empty(0), np.empty(0), np.empty(0)
+        x_valores = x_k
+        aproximaciones.append(y_k)
+
+    y_extrapolada, error_estimado = extrapolar(aproximaciones, orden=1)
+    return x_valores, y_extrapolada, error_estimado
+
+def metodo_euler_implicito(f_str, x0, y0, h, x_final, metodo='euler', tol=1e-10, max_iter=50,
+                           mostrar_tabla=True, imprimir_cada=1, instrumentacion=None):
+    """
+    Métodos implícitos para ecuaciones "rígidas" (stiff), donde Euler normal
+    necesita un h diminuto para no volverse inestable:
+    - metodo='euler': Euler implícito,  y₁ = y₀ + h·f(x₁, y₁)
+    - metodo='trapecio': regla del trapecio,  y₁ = y₀ + h/2·(f(x₀, y₀) + f(x₁, y₁))
+    La incógnita y₁ aparece en los dos lados, así que en cada paso se resuelve
+    con newton_raphson (del programa de Newton-Raphson) usando ∂f/∂y calculada
+    con sympy. Recibe la EDO como texto porque necesita derivarla.
+    Solo ecuaciones escalares. Devuelve (x, y) como metodo_euler.
+    """
+    if metodo not in ('euler', 'trapecio'):
+        raise ValueError("metodo debe ser 'euler' o 'trapecio'")
+    if np.ndim(y0) > 0:
+        raise ValueError("Los métodos implícitos solo aceptan ecuaciones escalares (no sistemas).")
+    if h == 0:
+        raise ValueError("El tamaño de paso 'h' no puede ser cero.")
+
+    n_pasos = int(round(abs(x_final - x0) / h))
+    if n_pasos == 0 and x0 != x_final:
+        # Igual que metodo_euler: avisamos y devolvemos arreglos vacíos
+        print("Error: El tamaño de paso 'h' es demasiado grande.")
+        return np.empty(0), np.empty(0)
+
+    # El núcleo de Newton-Raphson y la derivada simbólica vienen del otro programa
+    from cargador import cargar_metodo
+    newton = cargar_metodo('newton')
+    with fase(instrumentacion, 'parsear'):
+        f, df_dy = newton.derivada_parcial_y(f_str)
+    # Cada paso evalúa un número a la vez: usamos la versión escalar (con math)
+    f = contar(instrumentacion, version_escalar(f), 'f')
+    df_dy = contar(instrumentacion, version_escalar(df_dy), 'df_dy')
+
+    x_valores = x0 + h * np.arange(n_pasos + 1)
+    y_valores = np.empty(n_pasos + 1)
+    y_valores[0] = y0
+    # Peso de f(x₁, y₁) en la fórmula: h para Euler implícito, h/2 para el trapecio
+    peso = h if metodo == 'euler' else h / 2
+
+    guardados = 1
+    with fase(instrumentacion, 'integrar'):
+        for n in range(n_pasos):
+            x_n, y_n, x_sig = x_valores[n], y_valores[n], x_valores[n + 1]
+            try:
+                f_n = float(f(x_n, y_n))
+                # Lo que ya se conoce del lado derecho (no depende de y₁)
+                conocido = y_n + (h / 2) * f_n if metodo == 'trapecio' else y_n
+
+                # Buscamos la raíz de G(z) = z - conocido - peso·f(x₁, z); G'(z) = 1 - peso·∂f/∂y
+                G = lambda z: z - conocido - peso * f(x_sig, z)
+                G_prima = lambda z: 1 - peso * df_dy(x_sig, z)
+                # Empezamos desde la predicción de Euler normal
+                y_sig, iteraciones = newton.newton_raphson(G, G_prima, y_n + h * f_n, tol, max_iter)
+                if iteraciones and iteraciones[-1]['error'] >= tol:
+                    print(f"Aviso: Newton-Raphson no convergió en el paso {n + 1} (x = {x_sig:.4f})")
+            except (ValueError, ArithmeticError) as e:
+                print(f"Error en el paso {n + 1} (x = {x_sig:.4f}): {e}")
+                break
+            y_valores[n + 1] = y_sig
+            guardados += 1
+            if instrumentacion is not None and instrumentacion.por_paso is not None:
+                instrumentacion.por_paso(n + 1, x_sig, y_sig)
+
+    x_valores, y_valores = x_valores[:guardados], y_valores[:guardados]
+    if mostrar_tabla:
+        # Reutilizamos la misma tabla que el método de Euler normal
+        for _ in imprimir_tabla([(x_valores, y_valores)], cada=imprimir_cada, x0=x0, h=h):
+            pass
     return x_valores, y_valores
 
-# --- 5. Generador de gráficas ---
+# --- 5. Comparación con la solución analítica ---
+
+def evaluar_analitica(g_func, x):
+    """
+    Evalúa la solución analítica en todos los puntos de x de una sola vez.
+    Devuelve un arreglo con la misma forma que los resultados de Euler:
+    (puntos,) para una ecuación o (puntos, n) para un sistema.
+    """
+    x = np.asarray(x, dtype=float)
+    try:
+        resultado = g_func(x)
+    except TypeError:
+        # Función escalar (por ejemplo creada sin vectorial=True): punto por punto
+        return np.array([g_func(xi) for xi in x], dtype=float)
+
+    if isinstance(resultado, (list, tuple)):
+        # Un sistema devuelve una curva por componente (alguna puede ser constante)
+        return np.column_stack([np.broadcast_to(np.asarray(v, dtype=float), x.shape)
+                                for v in resultado])
+    # Si g es una constante, la repetimos en todos los puntos
+    return np.broadcast_to(np.asarray(resultado, dtype=float), x.shape)
 
-def plot_results(x_euler, y_euler, g_func, x0, x_final, h):
+def calcular_errores(x_euler, y_euler, g_func):
+    """
+    Calcula en una sola pasada la solución exacta y los errores de toda la
+    trayectoria (como las columnas "Error Abs" y "Err Rel(%)" de RK4).
+    Devuelve (y_real, error_abs, error_rel_porcentaje).
+    """
+    y_real = np.broadcast_to(evaluar_analitica(g_func, x_euler), np.shape(y_euler))
+    error_abs = np.abs(y_real - y_euler)
+    # Donde la solución exacta vale 0 el error relativo no está definido (inf o nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        error_rel = error_abs / np.abs(y_real) * 100
+    return y_real, error_abs, error_rel
+
+# --- 6. Generador de gráficas ---
+
+def plot_results(x_euler, y_euler, g_func, x0, x_final, h, instrumentacion=None, ruta=None):
     """
     Crea una gráfica que muestra los resultados del método de Euler.
     Si hay una solución analítica, también la dibuja para hacer comparaciones.
+    Con una Instrumentacion se mide el tiempo de dibujo ('graficar').
+    Si se da `ruta` (por ejemplo "euler.png" o "euler.svg"), la gráfica se guarda
+    en ese archivo sin abrir ninguna ventana.
     """
-    if not x_euler: # Verifica si hay datos para graficar
+    if len(x_euler) == 0: # Verifica si hay datos para graficar
         print("No hay datos para dibujar.")
         return
 
-    # Crea una nueva figura (ventana) para la gráfica
-    plt.figure(figsize=(10, 6))
+    with fase(instrumentacion, 'graficar'):
+        _dibujar_resultados(x_euler, y_euler, g_func, x0, x_final, h, ruta)
+
+def _dibujar_resultados(x_euler, y_euler, g_func, x0, x_final, h, ruta=None):
+    """Dibuja la gráfica de plot_results (separado para poder medir su tiempo)."""
+    # Crea una nueva figura (ventana) para la gráfica; con `ruta` se dibuja sin pantalla.
+    # matplotlib se importa recién aquí, porque tarda en cargarse
+    # (los cálculos sin gráficas arrancan mucho más rápido)
+    fig, ax = nueva_figura(ruta, figsize=(10, 6))
     
     # 1. Dibuja los puntos calculados con el método de Euler
+    # Con muchos puntos solo dibujamos el mínimo y el máximo de cada tramo (la forma
+    # de la curva no cambia) y quitamos los círculos, que ya no se distinguirían
+    indices = indices_reducidos(y_euler)
+    reducida = len(indices) < len(x_euler)
     # 'bo--' significa: puntos azules (b=blue, o=circles) unidos con línea discontinua (--)
-    plt.plot(x_euler, y_euler, 'bo--', label=f'Solución de Euler (h={h})')
+    ax.plot(x_euler[indices], y_euler[indices], 'b--' if reducida else 'bo--',
+            label=f'Solución de Euler (h={h})')
     
     # 2. Si el usuario proporcionó la solución exacta, también la dibujamos
     if g_func is not None:
         # Crea muchos puntos intermedios para que la curva se vea suave
         x_analitica = np.linspace(x0, x_final, 1000)
         try:
-            # Calcula los valores de la solución exacta en todos esos puntos
-            y_analitica = [g_func(x) for x in x_analitica]
+            # Calcula los valores de la solución exacta en todos esos puntos (de una vez)
+            y_analitica = evaluar_analitica(g_func, x_analitica)
             # Dibuja la solución exacta como una línea roja continua
-            plt.plot(x_analitica, y_analitica, 'r-', label='Solución analítica')
+            ax.plot(x_analitica, y_analitica, 'r-', label='Solución analítica')
         except Exception as e:
             print(f"Error al dibujar la solución analítica: {e}")
     
     # 3. Añade etiquetas y título para que la gráfica sea fácil de entender
-    plt.xlabel('x')
-    plt.ylabel('y')
-    plt.title('Comparación: Método de Euler vs Solución Analítica')
-    plt.legend() # Muestra la leyenda explicando qué línea es qué
-    plt.grid(True) # Añade una cuadrícula para facilitar la lectura
+    ax.set_xlabel('x')
+    ax.set_ylabel('y')
+    ax.set_title('Comparación: Método de Euler vs Solución Analítica')
+    ax.legend() # Muestra la leyenda explicando qué línea es qué
+    ax.grid(True) # Añade una cuadrícula para facilitar la lectura
     
-    # 4. Muestra la gráfica en pantalla
-    plt.show()
+    # 4. Muestra la gráfica en pantalla (o la guarda en el archivo pedido)
+    mostrar_o_guardar(fig, ruta)
 
-# --- 6. Función principal del programa ---
+# --- 7. Función principal del programa ---
 
 def main():
     """
@@ -222,23 +535,28 @@ def main():
         x_euler, y_euler = metodo_euler(f_func, x0, y0, h, x_final)
         
         # 3. Crea la gráfica con los resultados
-        if x_euler:  # Solo si se pudieron calcular resultados
+        if len(x_euler) > 0:  # Solo si se pudieron calcular resultados
             plot_results(x_euler, y_euler, g_func, x0, x_final, h)
         
         # 4. Muestra un resumen con los resultados principales
         print("\n--- Resumen Final ---")
         print(f"Punto inicial: ({x0}, {y0})")
-        print(f"Punto final calculado: ({x_euler[-1]:.4f}, {y_euler[-1]:.6f})" if x_euler else "No se pudo calcular")
+        print(f"Punto final calculado: ({x_euler[-1]:.4f}, {formatear_y(y_euler[-1]).strip()})" if len(x_euler) else "No se pudo calcular")
         print(f"Tamaño de paso usado: {h}")
-        print(f"Número de pasos: {len(x_euler)-1 if x_euler else 0}")
+        print(f"Número de pasos: {int(round((x_euler[-1] - x0) / h)) if len(x_euler) else 0}")
         
-        if g_func is not None and x_euler:
+        if g_func is not None and len(x_euler):
             try:
                 # Si hay solución exacta, calcula qué tan cerca estuvo nuestro resultado
-                y_real = g_func(x_euler[-1])
-                error = abs(y_euler[-1] - y_real)
-                print(f"Valor real en x_final: {y_real:.6f}")
-                print(f"Error absoluto: {error:.6f}")
+                # en todos los puntos de la trayectoria (una sola pasada con numpy)
+                y_real, error_abs, error_rel = calcular_errores(x_euler, y_euler, g_func)
+                print(f"Valor real en x_final: {formatear_y(y_real[-1]).strip()}")
+                # Para sistemas tomamos el mayor error entre todas las componentes
+                print(f"Error absoluto en x_final: {np.max(error_abs[-1]):.6f}")
+                print(f"Error relativo en x_final: {np.max(error_rel[-1]):.4f}%")
+                # El mayor error de toda la trayectoria y dónde ocurrió
+                peor = int(np.argmax(error_abs.reshape(len(x_euler), -1).max(axis=1)))
+                print(f"Error absoluto máximo: {np.max(error_abs[peor]):.6f} (en x = {x_euler[peor]:.4f})")
             except Exception as e:
                 print(f"No se pudo calcular el error: {e}")
         
@@ -250,7 +568,7 @@ def main():
         print(f"\nOcurrió un error inesperado: {e}")
         print("Por favor, revisa tus datos e intenta de nuevo.")
 
-# --- 7. Punto de inicio del programa ---
+# --- 8. Punto de inicio del programa ---
 
 if __name__ == "__main__":
     # Esta línea verifica si el archivo se está ejecutando directamente
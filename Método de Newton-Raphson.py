@@ -1,12 +1,705 @@
 # ===== LIBRERÍAS NECESARIAS =====
 # Estas son herramientas que necesitamos para que el programa funcione
 
+from collections import OrderedDict  # Diccionario que recuerda el orden (para la memoria de resultados)
+from concurrent.futures import ThreadPoolExecutor  # Para calcular en segundo plano sin congelar la ventana
+import threading  # Herramientas para coordinar el cálculo en segundo plano (cancelar)
+from functools import lru_cache  # Memoria automática para no repetir cálculos caros
 import numpy as np  # Nos ayuda a trabajar con cálculos matemáticos y listas de números
-import matplotlib.pyplot as plt  # Nos permite crear gráficas para visualizar los resultados
-import sympy as sp  # Biblioteca especializada en matemáticas simbólicas (derivadas automáticas)
-from sympy import symbols, diff, lambdify  # Herramientas específicas para trabajar con símbolos y derivadas
-import tkinter as tk  # Biblioteca para crear la interfaz gráfica (ventanas, botones, etc.)
-from tkinter import ttk, messagebox  # Elementos adicionales de la interfaz (botones modernos, mensajes)
+from motor_expresiones import compilar_expresion, normalizar, nombres_sympy, version_escalar  # Conversor seguro de fórmulas (compartido)
+from instrumentacion import contar, fase  # Contadores de evaluaciones y tiempos por fase (opcionales)
+
+# Las bibliotecas pesadas se cargan solo cuando hacen falta, para que usar los
+# métodos desde otros programas (lotes, procesos de trabajo) sea rápido:
+# - sympy (derivadas automáticas): al convertir una función que necesita derivada.
+# - matplotlib (gráficas): al dibujar.
+# - tkinter (ventanas, botones, mensajes): al crear la interfaz, con _importar_interfaz().
+tk = ttk = messagebox = None
+
+def _importar_interfaz():
+    """Importa tkinter la primera vez que se crea la ventana."""
+    global tk, ttk, messagebox
+    if tk is None:
+        import tkinter  # Biblioteca para crear la interfaz gráfica (ventanas, botones, etc.)
+        from tkinter import ttk as _ttk, messagebox as _messagebox  # Botones modernos y mensajes
+        tk, ttk, messagebox = tkinter, _ttk, _messagebox
+
+# ===== CONVERSIÓN DE TEXTO A FUNCIONES (CON MEMORIA) =====
+# Convertir el texto con sympy y crear las funciones con lambdify es lo más lento
+# de cada clic, así que guardamos el resultado para cada texto ya visto.
+
+def _compilar_simbolica(expr, x):
+    """
+    Convierte una expresión de sympy en función numérica usando el motor de
+    expresiones compartido (a partir de su código Python). Si el motor no
+    reconoce algo de lo que genera sympy, se usa lambdify como respaldo.
+    `x` puede ser un símbolo o una tupla de símbolos (funciones de varias variables).
+    """
+    import sympy as sp  # Biblioteca especializada en matemáticas simbólicas
+    simbolos = x if isinstance(x, tuple) else (x,)
+    try:
+        return compilar_expresion(sp.pycode(expr, fully_qualified_modules=True),
+                                  tuple(str(s) for s in simbolos))
+    except Exception:
+        return sp.lambdify(simbolos, expr, modules=['numpy'])
+
+@lru_cache(maxsize=None)
+def _simbolo_x():
+    """
+    Variable simbólica 'x' que usamos para las ecuaciones (siempre la misma).
+    La declaramos real para que las derivadas salgan simples (por ejemplo, la de abs(x) es sign(x)).
+    """
+    import sympy as sp
+    return sp.symbols('x', real=True)
+
+# ===== POLINOMIOS (CAMINO RÁPIDO) =====
+# Muchas funciones que se escriben son polinomios (como x**3 - 2*x - 5). Todas sus
+# raíces, reales y complejas, salen de una sola vez como los valores propios de su
+# matriz compañera. Si el polinomio está escrito desarrollado, con muchos términos
+# y grado bajo, además se evalúa con el esquema de Horner (n sumas y n
+# multiplicaciones, sin potencias), compilado como una expresión más del motor.
+
+# Grado máximo para evaluar con Horner y para buscar todas las raíces a la vez
+GRADO_MAX_HORNER = 20
+GRADO_MAX_RAICES = 200
+
+def _coeficientes(expr, x):
+    """
+    Coeficientes (del grado mayor al menor, como números float) si `expr` es un
+    polinomio en x de grado 1 o más con coeficientes numéricos; si no, None.
+    """
+    import sympy as sp
+    if not expr.is_polynomial(x):
+        return None
+    try:
+        poli = sp.Poly(expr, x)
+        coeficientes = tuple(float(c) for c in poli.all_coeffs())
+    except (sp.PolynomialError, TypeError, ValueError):
+        return None  # Coeficientes con otros símbolos o no reales
+    return coeficientes if len(coeficientes) > 1 else None
+
+def horner(coeficientes, x, derivada=False):
+    """
+    Evalúa el polinomio con el esquema de Horner en x (número, complejo o arreglo).
+    Con derivada=True devuelve (p, p'), calculadas en la misma pasada.
+    Lo usa raices_polinomio para pulir todas las raíces a la vez.
+    """
+    p = coeficientes[0] + 0 * x  # Con la forma de x (si x es un arreglo)
+    dp = 0 * x
+    for c in coeficientes[1:]:
+        if derivada:
+            dp = dp * x + p
+        p = p * x + c
+    return (p, dp) if derivada else p
+
+def _usar_horner(expr, coeficientes):
+    """
+    Horner solo gana cuando el polinomio es denso (casi todos los coeficientes
+    distintos de cero), de grado bajo y escrito ya desarrollado: para x**50 - 2
+    una sola potencia es más rápida, y en formas factorizadas como (x - 1)**4
+    el desarrollo pierde precisión cerca de las raíces repetidas.
+    """
+    import sympy as sp
+    grado = len(coeficientes) - 1
+    no_nulos = sum(1 for c in coeficientes if c != 0)
+    return grado <= GRADO_MAX_HORNER and 2 * no_nulos > grado and expr == sp.expand(expr)
+
+def _funcion_horner(coeficientes):
+    """
+    Función x -> p(x) con Horner, compilada por el motor de expresiones como
+    ((a·x + b)·x + c)·x + d: sin bucles de Python, acepta números y arreglos.
+    """
+    texto = repr(coeficientes[0])
+    for c in coeficientes[1:]:
+        texto = f"({texto})*x" + (f" + ({c!r})" if c != 0 else "")
+    return compilar_expresion(texto, ('x',))
+
+@lru_cache(maxsize=128)
+def coeficientes_polinomio(func_str):
+    """
+    Coeficientes del polinomio escrito en `func_str` (del grado mayor al menor),
+    o None si la función no es un polinomio. Solo convierte el texto con sympy
+    (sin derivar ni compilar nada), así que sirve también para los métodos sin
+    derivadas; si algo falla, la función simplemente no se trata como polinomio.
+    """
+    try:
+        return _coeficientes(_expresion_simbolica(func_str), _simbolo_x())
+    except Exception:
+        return None
+
+def _agrupar_raices(coeficientes, raices, tol=1e-14):
+    """
+    Junta las raíces repetidas. Una raíz de multiplicidad m sale de np.roots como
+    m raíces separadas por ~1e-16^(1/m) (1e-5 para m = 3), pero su promedio sí es
+    preciso. Un grupo de m raíces cercanas se acepta como una raíz de multiplicidad
+    m si en su promedio c se anulan p, p', ..., p^(m-1), relativo al tamaño de
+    cada término. Devuelve (centros, multiplicidades) como arreglos.
+    """
+    derivadas = [np.asarray(coeficientes, dtype=float)]
+
+    def es_multiple(c, m):
+        while len(derivadas) < m:
+            derivadas.append(np.polyder(derivadas[-1]))
+        for d in derivadas[:m]:
+            escala = np.polyval(np.abs(d), abs(c))  # Suma de |términos|
+            if not abs(np.polyval(d, c)) <= tol * escala:
+                return False
+        return True
+
+    pendientes = list(raices)
+    centros, multiplicidades = [], []
+    with np.errstate(all='ignore'):
+        while pendientes:
+            semilla = pendientes[0]
+            # Vecinas en orden de cercanía; probamos primero el grupo más grande
+            cercanas = sorted(pendientes, key=lambda z: abs(z - semilla))
+            cercanas = [z for z in cercanas if abs(z - semilla) <= 1e-2 * max(1.0, abs(semilla))]
+            for m in range(len(cercanas), 0, -1):
+                centro = complex(np.mean(cercanas[:m]))
+                if m == 1 or es_multiple(centro, m):
+                    break
+            centros.append(centro)
+            multiplicidades.append(m)
+            for z in cercanas[:m]:
+                pendientes.remove(z)
+    return np.array(centros, dtype=complex), np.array(multiplicidades)
+
+def raices_polinomio(coeficientes, pulir=True, max_iter=10, cancelar=None):
+    """
+    Todas las raíces del polinomio: los valores propios de su matriz compañera
+    (np.roots), con las repetidas juntas y su multiplicidad (ver _agrupar_raices).
+    Con pulir=True, cada una se mejora con unos pasos de Newton en aritmética
+    compleja (x - m·p/p' para las de multiplicidad m), que solo se aceptan si
+    reducen |p(x)|.
+    Devuelve (reales, complejas), listas de (raíz, multiplicidad): las reales
+    ordenadas de menor a mayor y las complejas ordenadas por su parte real.
+    `cancelar` (un threading.Event) se revisa entre las etapas del cálculo.
+    """
+    def revisar_cancelacion():
+        if cancelar is not None and cancelar.is_set():
+            raise CalculoCancelado()
+
+    raices = np.roots(coeficientes).astype(complex)
+    revisar_cancelacion()
+    raices, multiplicidades = _agrupar_raices(coeficientes, raices)
+    if pulir and len(raices):
+        for _ in range(max_iter):
+            revisar_cancelacion()
+            p, dp = horner(coeficientes, raices, True)
+            with np.errstate(all='ignore'):
+                nuevas = np.where(dp != 0, raices - multiplicidades * p / dp, raices)
+                mejora = np.abs(horner(coeficientes, nuevas)) < np.abs(p)
+            if not mejora.any():
+                break
+            raices = np.where(mejora, nuevas, raices)
+
+    reales, complejas = [], []
+    for z, m in zip(raices, multiplicidades.tolist()):
+        # Las raíces con parte imaginaria despreciable se consideran reales
+        if abs(z.imag) <= 1e-9 * max(1.0, abs(z)):
+            reales.append((float(z.real), m))
+        else:
+            # Igual con la parte real (por ejemplo ±i sale como ±i más un residuo de 1e-18)
+            if abs(z.real) <= 1e-9 * abs(z):
+                z = complex(0.0, z.imag)
+            complejas.append((complex(z), m))
+    reales.sort()
+    complejas.sort(key=lambda r: (r[0].real, r[0].imag))
+    return reales, complejas
+
+@lru_cache(maxsize=128)
+def _expresion_simbolica(func_str):
+    """Expresión de sympy del texto, después de que el motor compartido lo revise."""
+    import sympy as sp
+    compilar_expresion(func_str, ('x',))  # Lanza ValueError si el texto no es seguro
+    return sp.sympify(normalizar(func_str), locals={**nombres_sympy(), 'x': _simbolo_x()})
+
+@lru_cache(maxsize=128)
+def _parsear_funcion(func_str):
+    """
+    Convierte el texto en (f, f', expresión, derivada) y lo recuerda.
+    Si se vuelve a pedir el mismo texto, devuelve lo guardado sin recalcular nada.
+    Si la función es un polinomio denso de grado bajo, f y f' se evalúan con
+    el esquema de Horner (ver _usar_horner).
+    """
+    import sympy as sp
+    x = _simbolo_x()
+    # El motor compartido revisa que el texto sea seguro (acepta ^ como potencia)
+    # y crea directamente la función (escalar y vectorial), sin pasar por lambdify
+    f = compilar_expresion(func_str, ('x',))  # La función original
+    # Convierte el texto (ya revisado) en una expresión matemática simbólica
+    expr = _expresion_simbolica(func_str)
+    # Calcula la derivada una sola vez (sirve para las funciones y para mostrarla)
+    derivada = sp.diff(expr, x)
+    coeficientes = _coeficientes(expr, x)
+    if coeficientes is not None and _usar_horner(expr, coeficientes):
+        # Polinomio denso: Horner para f y para f' (sus coeficientes se calculan directamente)
+        grado = len(coeficientes) - 1
+        derivados = tuple(c * (grado - i) for i, c in enumerate(coeficientes[:-1]))
+        return _funcion_horner(coeficientes), _funcion_horner(derivados), expr, derivada
+    f_prime = _compilar_simbolica(derivada, x)  # Su derivada
+    return f, f_prime, expr, derivada
+
+@lru_cache(maxsize=128)
+def derivada_parcial_y(func_str):
+    """
+    Para una EDO dy/dx = f(x, y) escrita como texto, devuelve (f, ∂f/∂y) como
+    funciones f(x, y). ∂f/∂y es el "jacobiano" que necesitan los métodos
+    implícitos (Euler implícito, trapecio) para resolver cada paso con Newton-Raphson.
+    Solo para ecuaciones escalares (no sistemas).
+    """
+    import sympy as sp
+    x, y = _simbolo_x(), sp.symbols('y', real=True)
+    f = compilar_expresion(func_str, ('x', 'y'))  # Revisa que el texto sea seguro
+    expr = sp.sympify(normalizar(func_str), locals={**nombres_sympy(), 'x': x, 'y': y})
+    return f, _compilar_simbolica(sp.diff(expr, y), (x, y))
+
+@lru_cache(maxsize=128)
+def funcion_fusionada(func_str, orden=1, vectorial=False):
+    """
+    Una sola función que devuelve (f(x), f'(x)) o, con orden=2, (f(x), f'(x), f''(x)).
+    sympy busca las subexpresiones comunes (CSE) de todas ellas, así que cosas
+    como exp(...) o sin(...) que aparecen en f y en sus derivadas se calculan
+    una sola vez por punto. Con vectorial=False usa `math` (lo más rápido para un
+    número a la vez); con vectorial=True usa numpy y acepta arreglos (la usa
+    newton_raphson_multiple). Crearla cuesta un lambdify con CSE, así que solo
+    conviene cuando se van a hacer muchas evaluaciones.
+    """
+    import sympy as sp
+    x = _simbolo_x()
+    _, _, expr, derivada = _parsear_funcion(func_str)
+    expresiones = [expr, derivada] + ([derivada.diff(x)] if orden >= 2 else [])
+    if vectorial:
+        return sp.lambdify(x, expresiones, modules=['numpy'], cse=True)
+
+    fusion_math = sp.lambdify(x, expresiones, modules=['math'], cse=True)
+
+    def fusionada(valor):
+        try:
+            return fusion_math(valor)
+        except (ValueError, ArithmeticError, TypeError, NameError):
+            # `math` no maneja infinitos, complejos ni algunas funciones (como sign):
+            # en esos casos usamos la versión de numpy (se crea solo la primera vez
+            # que hace falta), que se comporta como f y f'
+            with np.errstate(all='ignore'):
+                return funcion_fusionada(func_str, orden, True)(valor)
+    return fusionada
+
+class CalculoCancelado(Exception):
+    """Se lanza cuando el usuario pulsa "Cancelar" mientras se está calculando."""
+
+# ===== ALGORITMO DE NEWTON-RAPHSON =====
+
+def _evaluador(f, f_prime, fusionada, instrumentacion, f_second=None):
+    """
+    Función x -> (f(x), f'(x)[, f''(x)]) como números: la fusionada si se da
+    (una sola llamada) o f, f' (y f'') por separado, contadas si hay instrumentación.
+    """
+    if fusionada is not None:
+        fusionada = contar(instrumentacion, fusionada, 'f_fusionada')
+        return lambda x: tuple(float(v) for v in fusionada(x))
+    # Se evalúa un número a la vez: las funciones del motor usan su versión escalar
+    f = contar(instrumentacion, version_escalar(f), 'f')
+    f_prime = contar(instrumentacion, version_escalar(f_prime), 'f_prime')
+    if f_second is None:
+        return lambda x: (float(f(x)), float(f_prime(x)))
+    f_second = contar(instrumentacion, version_escalar(f_second), 'f_second')
+    return lambda x: (float(f(x)), float(f_prime(x)), float(f_second(x)))
+
+def newton_raphson(f, f_prime, x0, tol=1e-6, max_iter=100, cancelar=None, progreso=None,
+                   instrumentacion=None, fusionada=None):
+    """
+    Implementa el algoritmo de Newton-Raphson para encontrar raíces de funciones.
+    El método funciona dibujando líneas tangentes y siguiendo donde tocan el eje x.
+    Repite este proceso hasta encontrar una aproximación muy precisa de la raíz.
+    No necesita la interfaz gráfica, así que también sirve para usarlo desde otros programas.
+    Opcionalmente recibe un threading.Event `cancelar` (si se activa, se lanza
+    CalculoCancelado) y una función `progreso(i, max_iter)` que se llama en cada paso.
+    Con una Instrumentacion se cuentan las evaluaciones de f y f', se mide la fase
+    'iterar' y se llama a su por_paso(iteración, x, f(x)) en cada paso.
+    Si se da `fusionada` (ver funcion_fusionada), f(x) y f'(x) se calculan con
+    una sola llamada que devuelve los dos valores.
+    """
+    # Si hay instrumentación, f y f' cuentan cuántas veces se evalúan
+    evaluar = _evaluador(f, f_prime, fusionada, instrumentacion)
+    por_paso = instrumentacion.por_paso if instrumentacion is not None else None
+    iterations = []  # Lista para guardar el progreso de cada paso
+    x = x0  # Empezamos desde el valor inicial que el usuario proporcionó
+
+    with fase(instrumentacion, 'iterar'):  # Mide el tiempo de las iteraciones
+        for i in range(max_iter):  # Repetimos hasta el máximo de iteraciones permitidas
+            # Revisamos si el usuario pidió detener el cálculo
+            if cancelar is not None and cancelar.is_set():
+                raise CalculoCancelado("Cálculo cancelado por el usuario.")
+            if progreso is not None:
+                progreso(i, max_iter)
+
+            # Calculamos f(x) y f'(x) (la pendiente) en el punto actual
+            fx, fpx = evaluar(x)
+
+            # Verificamos que la derivada no sea cero (evita divisiones problemáticas)
+            if abs(fpx) < 1e-12:
+                raise ValueError("Derivada cercana a cero. El método puede no converger.")
+
+            # Aplicamos la fórmula de Newton-Raphson: x_nuevo = x_actual - f(x)/f'(x)
+            x_new = x - fx / fpx
+            error = abs(x_new - x)  # Calculamos qué tanto cambió el resultado
+
+            # Guardamos toda la información de esta iteración
+            iterations.append({
+                'iter': i + 1,
+                'x': x,
+                'fx': fx,
+                'fpx': fpx,
+                'x_new': x_new,
+                'error': error
+            })
+
+            if por_paso is not None:
+                por_paso(i + 1, x, fx)
+
+            # Verificamos si ya encontramos una solución suficientemente precisa
+            if error < tol:
+                x = x_new
+                break  # Salimos del bucle porque ya tenemos la respuesta
+
+            x = x_new  # Preparamos la siguiente iteración
+
+    return x, iterations  # Devolvemos la raíz encontrada y todo el proceso
+
+def newton_raphson_multiple(f, f_prime, x0s, tol=1e-6, max_iter=100, fusionada=None):
+    """
+    Aplica Newton-Raphson a muchos valores iniciales a la vez (un arreglo x0s).
+    Todos los puntos avanzan juntos usando operaciones de numpy; cada uno
+    se "congela" cuando converge o cuando su derivada es casi cero.
+    Si se da `fusionada` (funcion_fusionada(..., vectorial=True)), f y f' se
+    calculan juntas sobre todo el arreglo, compartiendo las subexpresiones comunes.
+    Devuelve tres arreglos: las raíces, cuántas iteraciones hizo cada punto
+    y si cada punto convergió (True) o no (False).
+    """
+    x = np.array(x0s, dtype=float)  # Copia de los valores iniciales
+    iteraciones = np.zeros(x.shape, dtype=int)  # Contador de pasos por punto
+    convergio = np.zeros(x.shape, dtype=bool)  # Quién ya encontró su raíz
+    activos = np.ones(x.shape, dtype=bool)  # Quién sigue iterando
+
+    for _ in range(max_iter):
+        if not activos.any():
+            break  # Todos terminaron, no hace falta seguir
+
+        # Calculamos f(x) y f'(x) solo para los puntos que siguen activos
+        # (broadcast_to por si la función o la derivada es una constante)
+        xa = x[activos]
+        fx, fpx = fusionada(xa) if fusionada is not None else (f(xa), f_prime(xa))
+        fx = np.broadcast_to(fx, xa.shape)
+        fpx = np.broadcast_to(fpx, xa.shape)
+
+        # Los puntos con derivada casi cero se detienen sin converger
+        # (en la versión de un solo punto esto lanza un error)
+        plana = np.abs(fpx) < 1e-12
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_new = xa - fx / fpx
+        error = np.abs(x_new - xa)
+
+        # Guardamos el nuevo valor y contamos la iteración de los que avanzaron
+        idx = np.flatnonzero(activos)
+        avanzan = ~plana
+        x[idx[avanzan]] = x_new[avanzan]
+        iteraciones[idx[avanzan]] += 1
+
+        # Marcamos quién ya convergió y quién debe dejar de iterar
+        listos = avanzan & (error < tol)
+        convergio[idx[listos]] = True
+        activos[idx[listos | plana | ~np.isfinite(x_new)]] = False
+
+    return x, iteraciones, convergio
+
+def raices_distintas(raices, convergio, tol=1e-6):
+    """
+    Junta las raíces que encontró newton_raphson_multiple y quita las repetidas
+    (muchos puntos iniciales suelen llegar a la misma raíz).
+    Devuelve un arreglo ordenado con una sola copia de cada raíz.
+    """
+    encontradas = np.sort(raices[convergio])
+    if encontradas.size == 0:
+        return encontradas
+    # Una raíz es "nueva" si está separada de la anterior más que la tolerancia
+    nuevas = np.concatenate(([True], np.diff(encontradas) > tol))
+    return encontradas[nuevas]
+
+# ===== OTROS MÉTODOS PARA BUSCAR RAÍCES =====
+# Todos devuelven (raíz, iteraciones) con la misma tabla que newton_raphson
+# ('iter', 'x', 'fx', 'fpx', 'x_new', 'error'), así que la interfaz puede mostrar
+# cualquiera de ellos. Cuando un método no usa f'(x), en 'fpx' va la pendiente
+# que usó en su lugar (la de la secante) o NaN.
+
+def _revisar(cancelar, progreso, i, max_iter):
+    """Revisa si el usuario pidió cancelar y avisa del progreso (igual que en newton_raphson)."""
+    if cancelar is not None and cancelar.is_set():
+        raise CalculoCancelado("Cálculo cancelado por el usuario.")
+    if progreso is not None:
+        progreso(i, max_iter)
+
+def _fila(i, x, fx, fpx, x_new):
+    """Una fila de la tabla de iteraciones."""
+    return {'iter': i + 1, 'x': x, 'fx': fx, 'fpx': fpx, 'x_new': x_new, 'error': abs(x_new - x)}
+
+@lru_cache(maxsize=128)
+def _segunda_derivada(func_str):
+    """f''(x) para el método de Halley (se calcula una sola vez por texto)."""
+    _, _, _, derivada = _parsear_funcion(func_str)
+    x = _simbolo_x()
+    return _compilar_simbolica(derivada.diff(x), x)
+
+def secante(f, x0, tol=1e-6, max_iter=100, cancelar=None, progreso=None, instrumentacion=None, x1=None):
+    """
+    Método de la secante: como Newton-Raphson, pero la pendiente se toma de la
+    recta que une los dos últimos puntos, así que no necesita la derivada y
+    solo evalúa f una vez por iteración. Si no se da x1, se usa un punto muy
+    cercano a x0.
+    """
+    f = contar(instrumentacion, version_escalar(f), 'f')
+    por_paso = instrumentacion.por_paso if instrumentacion is not None else None
+    x_prev = x0
+    x = x1 if x1 is not None else x0 + 1e-4 * max(1.0, abs(x0))
+    f_prev, fx = float(f(x_prev)), float(f(x))
+    iterations = []
+
+    with fase(instrumentacion, 'iterar'):
+        for i in range(max_iter):
+            _revisar(cancelar, progreso, i, max_iter)
+
+            # Pendiente de la secante entre los dos últimos puntos
+            pendiente = (fx - f_prev) / (x - x_prev)
+            if abs(pendiente) < 1e-12:
+                raise ValueError("Pendiente de la secante cercana a cero. El método puede no converger.")
+
+            x_new = x - fx / pendiente
+            iterations.append(_fila(i, x, fx, pendiente, x_new))
+            if por_paso is not None:
+                por_paso(i + 1, x, fx)
+
+            if abs(x_new - x) < tol:
+                x = x_new
+                break
+            x_prev, f_prev = x, fx
+            x, fx = x_new, float(f(x_new))
+
+    return x, iterations
+
+def halley(f, f_prime, f_second, x0, tol=1e-6, max_iter=100, cancelar=None, progreso=None,
+           instrumentacion=None, fusionada=None):
+    """
+    Método de Halley: usa también la segunda derivada y converge de forma cúbica
+    (el número de cifras correctas se triplica en cada paso cerca de la raíz),
+    así que suele necesitar menos iteraciones que Newton-Raphson.
+    Fórmula: xₙ₊₁ = xₙ - 2·f·f' / (2·f'² - f·f'')
+    `fusionada` (opcional) devuelve (f, f', f'') con una sola llamada.
+    """
+    evaluar = _evaluador(f, f_prime, fusionada, instrumentacion, f_second)
+    por_paso = instrumentacion.por_paso if instrumentacion is not None else None
+    x = x0
+    iterations = []
+
+    with fase(instrumentacion, 'iterar'):
+        for i in range(max_iter):
+            _revisar(cancelar, progreso, i, max_iter)
+
+            fx, fpx, fppx = evaluar(x)
+            denominador = 2 * fpx**2 - fx * fppx
+            if abs(denominador) < 1e-12:
+                raise ValueError("Denominador de Halley cercano a cero. El método puede no converger.")
+
+            x_new = x - 2 * fx * fpx / denominador
+            iterations.append(_fila(i, x, fx, fpx, x_new))
+            if por_paso is not None:
+                por_paso(i + 1, x, fx)
+
+            if abs(x_new - x) < tol:
+                x = x_new
+                break
+            x = x_new
+
+    return x, iterations
+
+def buscar_intervalo(f, x0, max_expansiones=60):
+    """
+    Busca un intervalo [a, b] alrededor de x0 donde f cambie de signo (ahí hay una raíz),
+    ampliándolo al doble en cada intento. Lo necesitan Brent y Newton-Bisección.
+    Lanza ValueError si no encuentra ninguno.
+    """
+    fx0 = float(f(x0))
+    if fx0 == 0:
+        return x0, x0
+    paso = 0.1 * max(1.0, abs(x0))
+    for _ in range(max_expansiones):
+        for extremo in (x0 - paso, x0 + paso):
+            with np.errstate(all='ignore'):
+                f_extremo = float(f(extremo))
+            # Los puntos fuera del dominio (log de negativos, ...) dan NaN y se ignoran
+            if np.isfinite(f_extremo) and f_extremo * fx0 <= 0:
+                return min(x0, extremo), max(x0, extremo)
+        paso *= 2
+    raise ValueError(f"No se encontró un cambio de signo de f cerca de x0 = {x0}.")
+
+def brent(f, a, b, tol=1e-6, max_iter=100, cancelar=None, progreso=None, instrumentacion=None):
+    """
+    Método de Brent: combina bisección, secante e interpolación cuadrática inversa.
+    Necesita un intervalo [a, b] donde f cambie de signo, pero a cambio siempre
+    converge (nunca sale del intervalo) y no usa derivadas.
+    """
+    f = contar(instrumentacion, version_escalar(f), 'f')
+    por_paso = instrumentacion.por_paso if instrumentacion is not None else None
+    fa, fb = float(f(a)), float(f(b))
+    if fa * fb > 0:
+        raise ValueError("f(a) y f(b) deben tener signos opuestos.")
+
+    # c es el otro extremo del intervalo; d y e, el último paso y el anterior
+    c, fc = b, fb
+    d = e = b - a
+    iterations = []
+
+    with fase(instrumentacion, 'iterar'):
+        for i in range(max_iter):
+            _revisar(cancelar, progreso, i, max_iter)
+
+            if fb * fc > 0:
+                # La raíz quedó entre a y b: a pasa a ser el otro extremo
+                c, fc = a, fa
+                d = e = b - a
+            if abs(fc) < abs(fb):
+                # b siempre es el mejor punto encontrado hasta ahora
+                a, b, c = b, c, b
+                fa, fb, fc = fb, fc, fb
+
+            tol1 = 2 * np.finfo(float).eps * abs(b) + 0.5 * tol
+            xm = 0.5 * (c - b)
+            if abs(xm) <= tol1 or fb == 0:
+                break  # El intervalo ya es tan pequeño como la tolerancia
+
+            if abs(e) >= tol1 and abs(fa) > abs(fb):
+                # Intentamos interpolación (secante si a == c, cuadrática inversa si no)
+                s = fb / fa
+                if a == c:
+                    p, q = 2 * xm * s, 1 - s
+                else:
+                    q, r = fa / fc, fb / fc
+                    p = s * (2 * xm * q * (q - r) - (b - a) * (r - 1))
+                    q = (q - 1) * (r - 1) * (s - 1)
+                if p > 0:
+                    q = -q
+                p = abs(p)
+                # Solo aceptamos la interpolación si cae dentro del intervalo y avanza lo suficiente
+                if 2 * p < min(3 * xm * q - abs(tol1 * q), abs(e * q)):
+                    e, d = d, p / q
+                else:
+                    d = e = xm  # Bisección
+            else:
+                d = e = xm  # Bisección
+
+            a, fa = b, fb
+            x_new = b + d if abs(d) > tol1 else b + np.copysign(tol1, xm)
+            iterations.append(_fila(i, b, fb, float('nan'), x_new))
+            if por_paso is not None:
+                por_paso(i + 1, b, fb)
+            b, fb = x_new, float(f(x_new))
+
+    return b, iterations
+
+def newton_biseccion(f, f_prime, a, b, x0=None, tol=1e-6, max_iter=100, cancelar=None, progreso=None,
+                     instrumentacion=None, fusionada=None):
+    """
+    Newton-Raphson protegido: mantiene un intervalo [a, b] con cambio de signo y,
+    si el paso de Newton saldría del intervalo, avanzaría poco o la derivada es
+    casi cero, hace un paso de bisección en su lugar. Converge tan rápido como
+    Newton cerca de la raíz, pero nunca diverge ni falla por f'(x) = 0.
+    `fusionada` (opcional) devuelve (f, f') con una sola llamada.
+    """
+    evaluar = _evaluador(f, f_prime, fusionada, instrumentacion)
+    f = contar(instrumentacion, version_escalar(f), 'f')
+    por_paso = instrumentacion.por_paso if instrumentacion is not None else None
+    fa, fb = float(f(a)), float(f(b))
+    if fa * fb > 0:
+        raise ValueError("f(a) y f(b) deben tener signos opuestos.")
+    if fa == 0 or fb == 0:
+        return (a if fa == 0 else b), []
+
+    # x_bajo es el extremo donde f < 0 y x_alto donde f > 0
+    x_bajo, x_alto = (a, b) if fa < 0 else (b, a)
+    x = x0 if x0 is not None and min(a, b) <= x0 <= max(a, b) else 0.5 * (a + b)
+    paso_anterior = paso = abs(b - a)
+    fx, fpx = evaluar(x)
+    iterations = []
+
+    with fase(instrumentacion, 'iterar'):
+        for i in range(max_iter):
+            _revisar(cancelar, progreso, i, max_iter)
+
+            fuera = ((x - x_alto) * fpx - fx) * ((x - x_bajo) * fpx - fx) > 0
+            lento = abs(2 * fx) > abs(paso_anterior * fpx)
+            paso_anterior = paso
+            if fuera or lento:
+                # Bisección: el punto medio del intervalo actual
+                paso = 0.5 * (x_alto - x_bajo)
+                x_new = x_bajo + paso
+            else:
+                # Paso de Newton normal
+                paso = fx / fpx
+                x_new = x - paso
+
+            iterations.append(_fila(i, x, fx, fpx, x_new))
+            if por_paso is not None:
+                por_paso(i + 1, x, fx)
+
+            if abs(x_new - x) < tol:
+                x = x_new
+                break
+            x = x_new
+            fx, fpx = evaluar(x)
+            # Achicamos el intervalo conservando el cambio de signo
+            if fx < 0:
+                x_bajo = x
+            else:
+                x_alto = x
+
+    return x, iterations
+
+# Métodos disponibles en la interfaz y qué necesita cada uno de la función
+METODOS_RAIZ = {
+    'Newton-Raphson': 'derivada',
+    'Newton-Bisección': 'derivada',
+    'Halley': 'segunda derivada',
+    'Secante': 'sin derivada',
+    'Brent': 'sin derivada',
+}
+
+def buscar_raiz(metodo, func_str, f, f_prime, x0, tol=1e-6, max_iter=100, cancelar=None,
+                progreso=None, instrumentacion=None, fusionar=False):
+    """
+    Ejecuta el método `metodo` (una clave de METODOS_RAIZ) desde x0 y devuelve
+    (raíz, iteraciones). Brent y Newton-Bisección buscan primero un intervalo
+    con cambio de signo alrededor de x0; Halley calcula f'' a partir de `func_str`.
+    Con fusionar=True, los métodos con derivadas evalúan f, f' (y f'') juntas
+    con funcion_fusionada, compartiendo las subexpresiones comunes.
+    """
+    fusionada = None
+    if fusionar and METODOS_RAIZ.get(metodo, 'sin derivada') != 'sin derivada':
+        fusionada = funcion_fusionada(func_str.strip(), 2 if metodo == 'Halley' else 1)
+
+    if metodo == 'Newton-Raphson':
+        return newton_raphson(f, f_prime, x0, tol, max_iter, cancelar, progreso, instrumentacion, fusionada)
+    if metodo == 'Secante':
+        return secante(f, x0, tol, max_iter, cancelar, progreso, instrumentacion)
+    if metodo == 'Halley':
+        f_second = None if fusionada is not None else _segunda_derivada(func_str.strip())
+        return halley(f, f_prime, f_second, x0, tol, max_iter, cancelar, progreso, instrumentacion, fusionada)
+    if metodo in ('Brent', 'Newton-Bisección'):
+        a, b = buscar_intervalo(f, x0)
+        if metodo == 'Brent':
+            return brent(f, a, b, tol, max_iter, cancelar, progreso, instrumentacion)
+        return newton_biseccion(f, f_prime, a, b, x0, tol, max_iter, cancelar, progreso,
+                                instrumentacion, fusionada)
+    raise ValueError(f"Método desconocido: {metodo}. Opciones: {', '.join(METODOS_RAIZ)}")
+
 
 # ===== CLASE PRINCIPAL DEL CALCULADOR =====
 # Esta clase contiene todo lo necesario para crear la interfaz gráfica y realizar los cálculos
@@ -16,11 +709,27 @@ class NewtonRaphsonCalculator:
         """
         Inicializa el programa creando la ventana principal y preparando las herramientas matemáticas.
         """
+        _importar_interfaz()  # tkinter se carga aquí y no al importar el módulo
         self.root = tk.Tk()  # Crea la ventana principal
         self.root.title("Método de Newton-Raphson")  # Le pone título a la ventana
         self.root.geometry("600x700")  # Define el tamaño de la ventana
-        # Crea una variable simbólica 'x' que usaremos para las ecuaciones
-        self.x = symbols('x')
+        # Variable simbólica 'x' que usaremos para las ecuaciones
+        self.x = _simbolo_x()
+        # Memoria de resultados ya calculados: (función, x0, tol, max_iter) -> resultado
+        self._resultados_cache = OrderedDict()
+        self._max_resultados_cache = 64
+        # Los cálculos se hacen en un hilo aparte para que la ventana no se congele
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._cancelar = threading.Event()  # Se activa al pulsar "Cancelar"
+        self._progreso = 0.0  # Fracción de iteraciones hechas (la lee la ventana)
+        self._calculando = False  # Evita lanzar dos cálculos a la vez
+        self._tabla_actual = None  # Identifica la tabla que se está escribiendo por lotes
+        # Instrumentacion opcional (ver instrumentacion.py) para medir evaluaciones y tiempos
+        self.instrumentacion = None
+        # Evaluar f y f' juntas (subexpresiones comunes una sola vez, ver funcion_fusionada).
+        # Apagado por omisión: crear la función fusionada cuesta más que lo que
+        # ahorra en las pocas iteraciones de un clic
+        self.fusionar = False
         self.setup_ui()  # Llama a la función que creará todos los elementos visuales
 
     def setup_ui(self):
@@ -94,6 +803,14 @@ las raíces de una función real. Fórmula: xₙ₊₁ = xₙ - f(xₙ)/f'(xₙ)
         self.max_iter_entry.grid(row=2, column=1, sticky=tk.W, pady=5)
         self.max_iter_entry.insert(0, "100")  # Suficientes intentos por defecto
 
+        # Selector del método: Newton-Raphson u otros que no necesitan derivada o no divergen
+        ttk.Label(params_frame, text="Método:").grid(
+            row=3, column=0, sticky=tk.W, pady=5)
+        self.metodo_combo = ttk.Combobox(params_frame, values=list(METODOS_RAIZ),
+                                         state="readonly", width=18)
+        self.metodo_combo.grid(row=3, column=1, sticky=tk.W, pady=5)
+        self.metodo_combo.set('Newton-Raphson')  # Método por defecto
+
         # Sección de botones principales del programa
         button_frame = ttk.Frame(main_frame)
         button_frame.grid(row=7, column=0, columnspan=2, pady=20)
@@ -113,6 +830,18 @@ las raíces de una función real. Fórmula: xₙ₊₁ = xₙ - f(xₙ)/f'(xₙ)
                                command=self.clear_fields)
         clear_btn.grid(row=0, column=2, padx=10)
 
+        # Botón para detener un cálculo largo (solo se activa mientras se calcula)
+        self.cancel_btn = ttk.Button(button_frame, text="Cancelar",
+                                     command=self.cancelar_calculo, state=tk.DISABLED)
+        self.cancel_btn.grid(row=0, column=3, padx=10)
+        self.action_buttons = (calc_btn, graph_btn, clear_btn)
+
+        # Barra de progreso y mensaje de estado del cálculo en segundo plano
+        self.progress_bar = ttk.Progressbar(button_frame, mode='determinate', maximum=1.0)
+        self.progress_bar.grid(row=1, column=0, columnspan=4, sticky=(tk.W, tk.E), pady=(10, 0))
+        self.status_label = ttk.Label(button_frame, text="", foreground="gray")
+        self.status_label.grid(row=2, column=0, columnspan=4)
+
         # Área donde se mostrarán los resultados del cálculo
         results_frame = ttk.LabelFrame(main_frame, text="Resultados", padding="10")
         results_frame.grid(row=8, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=10)
@@ -138,68 +867,93 @@ las raíces de una función real. Fórmula: xₙ₊₁ = xₙ - f(xₙ)/f'(xₙ)
         results_frame.columnconfigure(0, weight=1)
         results_frame.rowconfigure(0, weight=1)
 
-    def parse_function(self, func_str):
+    def parse_function(self, func_str, derivada=True):
         """
         Convierte un texto como "x**2 + 3*x - 5" en funciones matemáticas que la computadora puede usar.
         También calcula automáticamente la derivada que necesita el método de Newton-Raphson.
+        Devuelve (f, f_prime, expr, derivada); los textos ya vistos salen de la memoria.
+        Con derivada=False no usa sympy (lo más lento): f_prime y derivada son None
+        y expr es el texto normalizado. Sirve para los métodos sin derivadas.
         """
         try:
-            # Reemplaza ^ por ** porque Python usa ** para potencias
-            func_str = func_str.replace('^', '**')
-            # Convierte el texto en una expresión matemática simbólica
-            expr = sp.sympify(func_str)
-            # Crea funciones numéricas que pueden calcular valores rápidamente
-            f = lambdify(self.x, expr, modules=['numpy'])  # La función original
-            f_prime = lambdify(self.x, diff(expr, self.x), modules=['numpy'])  # Su derivada
-            return f, f_prime, expr
+            with fase(self.instrumentacion, 'parsear'):
+                if not derivada:
+                    return compilar_expresion(func_str, ('x',)), None, normalizar(func_str), None
+                return _parsear_funcion(func_str.strip())
         except Exception as e:
             # Si el texto no se puede convertir, muestra un error explicativo
             raise ValueError(f"Error en la función: {str(e)}")
 
-    def newton_raphson(self, f, f_prime, x0, tol=1e-6, max_iter=100):
+    def resolver_con_cache(self, func_str, x0, tol, max_iter, cancelar=None, progreso=None,
+                           metodo='Newton-Raphson'):
+        """
+        Convierte la función y ejecuta el método elegido (Newton-Raphson por defecto),
+        pero recuerda los últimos resultados: si se piden los mismos datos otra vez
+        (por ejemplo al graficar justo después de calcular), se devuelven sin repetir
+        las iteraciones. Devuelve (f, f_prime, expr, derivada, raiz, iteraciones).
+        """
+        if metodo not in METODOS_RAIZ:
+            raise ValueError(f"Método desconocido: {metodo}")
+        # Los métodos sin derivadas no necesitan sympy
+        f, f_prime, expr, derivada = self.parse_function(
+            func_str, derivada=METODOS_RAIZ[metodo] != 'sin derivada')
+        clave = (metodo, func_str.strip(), x0, tol, max_iter)
+
+        if clave in self._resultados_cache:
+            # Ya lo calculamos antes: lo marcamos como usado recientemente
+            self._resultados_cache.move_to_end(clave)
+            raiz, iteraciones = self._resultados_cache[clave]
+        else:
+            if metodo == 'Newton-Raphson' and not self.fusionar:
+                raiz, iteraciones = self.newton_raphson(f, f_prime, x0, tol, max_iter, cancelar, progreso)
+            else:
+                raiz, iteraciones = buscar_raiz(metodo, func_str, f, f_prime, x0, tol, max_iter,
+                                                cancelar, progreso, self.instrumentacion, self.fusionar)
+            self._resultados_cache[clave] = (raiz, iteraciones)
+            # Si la memoria se llenó, olvidamos el resultado más antiguo
+            if len(self._resultados_cache) > self._max_resultados_cache:
+                self._resultados_cache.popitem(last=False)
+
+        return f, f_prime, expr, derivada, raiz, iteraciones
+
+    def newton_raphson(self, f, f_prime, x0, tol=1e-6, max_iter=100, cancelar=None, progreso=None):
         """
         Implementa el algoritmo de Newton-Raphson para encontrar raíces de funciones.
-        El método funciona dibujando líneas tangentes y siguiendo donde tocan el eje x.
-        Repite este proceso hasta encontrar una aproximación muy precisa de la raíz.
+        El cálculo lo hace la función newton_raphson del módulo (sin interfaz gráfica).
         """
-        iterations = []  # Lista para guardar el progreso de cada paso
-        x = x0  # Empezamos desde el valor inicial que el usuario proporcionó
-
-        for i in range(max_iter):  # Repetimos hasta el máximo de iteraciones permitidas
-            fx = float(f(x))    # Calculamos f(x) en el punto actual
-            fpx = float(f_prime(x))  # Calculamos f'(x) (la pendiente) en el punto actual
-
-            # Verificamos que la derivada no sea cero (evita divisiones problemáticas)
-            if abs(fpx) < 1e-12:
-                raise ValueError("Derivada cercana a cero. El método puede no converger.")
-
-            # Aplicamos la fórmula de Newton-Raphson: x_nuevo = x_actual - f(x)/f'(x)
-            x_new = x - fx / fpx
-            error = abs(x_new - x)  # Calculamos qué tanto cambió el resultado
+        return newton_raphson(f, f_prime, x0, tol, max_iter, cancelar, progreso, self.instrumentacion)
 
-            # Guardamos toda la información de esta iteración
-            iterations.append({
-                'iter': i + 1,
-                'x': x,
-                'fx': fx,
-                'fpx': fpx,
-                'x_new': x_new,
-                'error': error
-            })
-
-            # Verificamos si ya encontramos una solución suficientemente precisa
-            if error < tol:
-                x = x_new
-                break  # Salimos del bucle porque ya tenemos la respuesta
-
-            x = x_new  # Preparamos la siguiente iteración
+    def raices_si_polinomio(self, func_str, cancelar=None):
+        """
+        Si la función es un polinomio, devuelve (grado, reales, complejas) con todas
+        sus raíces (ver raices_polinomio); si no lo es, o si su grado pasa de
+        GRADO_MAX_RAICES (np.roots tardaría segundos), None. Una sola llamada
+        sustituye a lanzar Newton-Raphson desde muchos valores iniciales.
+        """
+        with fase(self.instrumentacion, 'parsear'):
+            coeficientes = coeficientes_polinomio(func_str.strip())
+        if coeficientes is None or len(coeficientes) - 1 > GRADO_MAX_RAICES:
+            return None
+        with fase(self.instrumentacion, 'iterar'):
+            reales, complejas = raices_polinomio(coeficientes, cancelar=cancelar)
+        return len(coeficientes) - 1, reales, complejas
+
+    def newton_raphson_multiple(self, f, f_prime, x0s, tol=1e-6, max_iter=100, fusionada=None):
+        """
+        Newton-Raphson desde muchos valores iniciales a la vez. El cálculo lo hace
+        la función newton_raphson_multiple del módulo (sin interfaz gráfica).
+        """
+        return newton_raphson_multiple(f, f_prime, x0s, tol, max_iter, fusionada)
 
-        return x, iterations  # Devolvemos la raíz encontrada y todo el proceso
+    def raices_distintas(self, raices, convergio, tol=1e-6):
+        """Raíces sin repetir de newton_raphson_multiple (ver la función del módulo)."""
+        return raices_distintas(raices, convergio, tol)
 
     def calculate_root(self):
         """
         Función principal que coordina todo el proceso de cálculo.
         Toma los datos de la interfaz, aplica el método de Newton-Raphson y muestra los resultados.
+        El cálculo se hace en segundo plano para que la ventana siga respondiendo.
         """
         try:
             # Obtiene todos los parámetros que el usuario escribió en la interfaz
@@ -207,37 +961,108 @@ las raíces de una función real. Fórmula: xₙ₊₁ = xₙ - f(xₙ)/f'(xₙ)
             x0 = float(self.x0_entry.get())   # Valor inicial
             tol = float(self.tol_entry.get()) # Tolerancia (precisión deseada)
             max_iter = int(self.max_iter_entry.get())  # Máximo de intentos
+            metodo = self.metodo_combo.get()  # Método elegido
+        except Exception as e:
+            # Si algo sale mal, muestra un mensaje de error amigable al usuario
+            messagebox.showerror("Error", f"Error en el cálculo: {str(e)}")
+            return
 
+        def tarea():
             # Convierte el texto de la función en funciones matemáticas utilizables
-            f, f_prime, expr = self.parse_function(func_str)
-
-            # Calcula la derivada simbólica para mostrar en los resultados
-            derivada = diff(expr, self.x)
-
-            # Ejecuta el método de Newton-Raphson
-            raiz, iteraciones = self.newton_raphson(f, f_prime, x0, tol, max_iter)
-
+            # (con su derivada simbólica para mostrar) y ejecuta el método elegido.
+            # Si ya se calculó con estos mismos datos, se reutiliza el resultado.
+            resultado = self.resolver_con_cache(func_str, x0, tol, max_iter,
+                                                self._cancelar, self._actualizar_progreso, metodo)
+            # Si es un polinomio, además se calculan todas sus raíces de una vez
+            return resultado, self.raices_si_polinomio(func_str, self._cancelar)
+
+        def al_terminar(salida):
+            (f, f_prime, expr, derivada, raiz, iteraciones), raices = salida
             # Presenta todos los resultados en la interfaz de manera organizada
-            self.mostrar_resultados(expr, derivada, raiz, iteraciones)
+            self.mostrar_resultados(expr, derivada, raiz, iteraciones, metodo, raices, f)
 
-        except Exception as e:
-            # Si algo sale mal, muestra un mensaje de error amigable al usuario
-            messagebox.showerror("Error", f"Error en el cálculo: {str(e)}")
+        self._ejecutar_en_segundo_plano(tarea, al_terminar, "Error en el cálculo")
+
+    def _actualizar_progreso(self, i, max_iter):
+        """Lo llama el hilo de cálculo: solo guarda el número, la ventana lo lee después."""
+        self._progreso = (i + 1) / max_iter
 
-    def mostrar_resultados(self, expr, derivada, raiz, iteraciones):
+    def _ejecutar_en_segundo_plano(self, tarea, al_terminar, titulo_error):
+        """
+        Lanza `tarea` en el hilo de trabajo y vigila cada poco tiempo (con root.after)
+        si ya terminó. Tkinter solo puede tocarse desde el hilo principal, así que
+        `al_terminar(resultado)` se llama aquí y no en el hilo de trabajo.
+        """
+        if self._calculando:
+            return  # Ya hay un cálculo en marcha
+        self._calculando = True
+        self._cancelar.clear()
+        self._progreso = 0.0
+
+        # Mientras se calcula: botones bloqueados, "Cancelar" activo y barra en cero
+        for boton in self.action_buttons:
+            boton.configure(state=tk.DISABLED)
+        self.cancel_btn.configure(state=tk.NORMAL)
+        self.progress_bar['value'] = 0.0
+        self.status_label.configure(text="Calculando...")
+
+        futuro = self._executor.submit(tarea)
+
+        def revisar():
+            if not futuro.done():
+                # Aún no termina: actualizamos la barra y volvemos a mirar en 50 ms
+                self.progress_bar['value'] = self._progreso
+                self.root.after(50, revisar)
+                return
+
+            # Terminó: devolvemos la interfaz a su estado normal
+            self._calculando = False
+            for boton in self.action_buttons:
+                boton.configure(state=tk.NORMAL)
+            self.cancel_btn.configure(state=tk.DISABLED)
+            self.progress_bar['value'] = 1.0
+
+            try:
+                resultado = futuro.result()
+            except CalculoCancelado:
+                self.status_label.configure(text="Cálculo cancelado.")
+                return
+            except Exception as e:
+                self.status_label.configure(text="")
+                messagebox.showerror("Error", f"{titulo_error}: {str(e)}")
+                return
+            self.status_label.configure(text="Listo.")
+            al_terminar(resultado)
+
+        self.root.after(50, revisar)
+
+    def cancelar_calculo(self):
+        """Pide al hilo de cálculo que se detenga en la siguiente iteración."""
+        self._cancelar.set()
+        self.status_label.configure(text="Cancelando...")
+
+    def mostrar_resultados(self, expr, derivada, raiz, iteraciones, metodo='Newton-Raphson',
+                           raices=None, f=None):
         """
         Organiza y presenta todos los resultados del cálculo de manera clara y detallada.
         Muestra la función, su derivada, una tabla con cada iteración y el resultado final.
+        Si se dan `raices` (ver raices_si_polinomio), al final se listan todas las
+        raíces del polinomio, reales y complejas. `f` se usa para mostrar f(raíz)
+        cuando el método no hizo ninguna iteración.
         """
         self.results_text.delete(1.0, tk.END)  # Limpia el área de resultados
 
         # Encabezado principal
-        self.results_text.insert(tk.END, "MÉTODO DE NEWTON-RAPHSON\n")
+        self.results_text.insert(tk.END, f"MÉTODO DE {metodo.upper()}\n")
         self.results_text.insert(tk.END, "=" * 50 + "\n\n")
 
-        # Información sobre la función y su derivada
+        # Información sobre la función y su derivada (los métodos sin derivadas no la calculan;
+        # en su tabla, la columna f'(xₙ) trae la pendiente de la secante o NaN)
         self.results_text.insert(tk.END, f"Función: f(x) = {expr}\n")
-        self.results_text.insert(tk.END, f"Derivada: f'(x) = {derivada}\n\n")
+        if derivada is None:
+            self.results_text.insert(tk.END, "Derivada: no se usa en este método\n\n")
+        else:
+            self.results_text.insert(tk.END, f"Derivada: f'(x) = {derivada}\n\n")
 
         # Tabla detallada con cada paso del método
         self.results_text.insert(tk.END, "ITERACIONES:\n")
@@ -248,49 +1073,102 @@ las raíces de una función real. Fórmula: xₙ₊₁ = xₙ - f(xₙ)/f'(xₙ)
                                      'Iter', 'xₙ', 'f(xₙ)', "f'(xₙ)", 'xₙ₊₁', 'Error'))
         self.results_text.insert(tk.END, "-" * 80 + "\n")
 
-        # Muestra cada iteración con todos sus valores calculados
-        for it in iteraciones:
-            self.results_text.insert(tk.END,
-                                     f"{it['iter']:<6} {it['x']:<12.6f} {it['fx']:<12.6f} "
-                                     f"{it['fpx']:<12.6f} {it['x_new']:<12.6f} {it['error']:<12.2e}\n")
-
-        # Resumen final con la solución encontrada
-        self.results_text.insert(tk.END, "-" * 80 + "\n\n")
-        if iteraciones:
-            last_fx = iteraciones[-1]['fx']
-        else:
-            last_fx = float(sp.N(expr.subs(self.x, raiz)))
-        self.results_text.insert(tk.END, f"RAÍZ ENCONTRADA: x = {raiz:.8f}\n")
-        self.results_text.insert(tk.END, f"f({raiz:.8f}) = {last_fx:.2e}\n")
-        self.results_text.insert(tk.END, f"Iteraciones realizadas: {len(iteraciones)}\n")
+        # Muestra cada iteración con todos sus valores calculados.
+        # Las filas se insertan por lotes (un solo insert por lote) y cada lote en
+        # una llamada distinta de root.after, para que la ventana no se congele
+        # aunque haya miles de iteraciones.
+        filas = [f"{it['iter']:<6} {it['x']:<12.6f} {it['fx']:<12.6f} "
+                 f"{it['fpx']:<12.6f} {it['x_new']:<12.6f} {it['error']:<12.2e}\n"
+                 for it in iteraciones]
+
+        # Si llega otro resultado mientras tanto, los lotes pendientes de este se descartan
+        self._tabla_actual = tabla = object()
+
+        def insertar_lote(inicio=0, tam_lote=200):
+            if self._tabla_actual is not tabla:
+                return
+            self.results_text.insert(tk.END, "".join(filas[inicio:inicio + tam_lote]))
+            if inicio + tam_lote < len(filas):
+                self.root.after(1, insertar_lote, inicio + tam_lote)
+                return
+
+            # Resumen final con la solución encontrada
+            self.results_text.insert(tk.END, "-" * 80 + "\n\n")
+            if iteraciones:
+                last_fx = iteraciones[-1]['fx']
+            else:
+                # Sin iteraciones (por ejemplo, x0 ya era la raíz) evaluamos f directamente
+                last_fx = float(f(raiz)) if f is not None else float('nan')
+            self.results_text.insert(tk.END, f"RAÍZ ENCONTRADA: x = {raiz:.8f}\n")
+            self.results_text.insert(tk.END, f"f({raiz:.8f}) = {last_fx:.2e}\n")
+            self.results_text.insert(tk.END, f"Iteraciones realizadas: {len(iteraciones)}\n")
+
+            if raices is not None:
+                grado, reales, complejas = raices
+                self.results_text.insert(tk.END, f"\nTODAS LAS RAÍCES (polinomio de grado {grado}):\n")
+                for r, m in reales:
+                    multiplicidad = f"  (multiplicidad {m})" if m > 1 else ""
+                    self.results_text.insert(tk.END, f"  x = {r:.10g}{multiplicidad}\n")
+                for z, m in complejas:
+                    signo = '-' if z.imag < 0 else '+'
+                    multiplicidad = f"  (multiplicidad {m})" if m > 1 else ""
+                    self.results_text.insert(
+                        tk.END, f"  x = {z.real + 0.0:.10g} {signo} {abs(z.imag):.10g}i{multiplicidad}\n")
+
+        insertar_lote()
 
     def plot_function(self):
         """
         Crea gráficas visuales para mostrar la función y cómo converge el método.
         Genera dos gráficos: uno mostrando la función y su raíz, otro mostrando la velocidad de convergencia.
+        Los cálculos se hacen en segundo plano; el dibujo, en la ventana principal.
         """
         try:
             # Obtiene los datos necesarios de la interfaz
             func_str = self.func_entry.get()
             x0 = float(self.x0_entry.get())
+            tol = float(self.tol_entry.get())
+            max_iter = int(self.max_iter_entry.get())
+            metodo = self.metodo_combo.get()
+        except Exception as e:
+            # Si hay algún problema, muestra un error amigable
+            messagebox.showerror("Error", f"Error al graficar: {str(e)}")
+            return
 
-            # Convierte la función de texto a funciones matemáticas
-            f, f_prime, expr = self.parse_function(func_str)
+        def calcular():
+            # Convierte la función y ejecuta el método para obtener la raíz y el proceso
+            # de convergencia (si ya se calculó con "Calcular Raíz", no se repite)
+            f, f_prime, expr, derivada, raiz, iteraciones = self.resolver_con_cache(
+                func_str, x0, tol, max_iter, self._cancelar, self._actualizar_progreso, metodo)
 
-            # Ejecuta el método para obtener la raíz y el proceso de convergencia
-            raiz, iteraciones = self.newton_raphson(f, f_prime, x0)
+            # Puntos alrededor de la raíz y valores de la función en esos puntos
+            x_vals = np.linspace(raiz - 3, raiz + 3, 400)
+            y_vals = f(x_vals)
+            return expr, raiz, float(f(raiz)), x_vals, y_vals, iteraciones
 
+        def al_terminar(resultado):
+            try:
+                self._dibujar_graficas(*resultado)
+            except Exception as e:
+                messagebox.showerror("Error", f"Error al graficar: {str(e)}")
+
+        self._ejecutar_en_segundo_plano(calcular, al_terminar, "Error al graficar")
+
+    def _dibujar_graficas(self, expr, raiz, f_raiz, x_vals, y_vals, iteraciones):
+        """
+        Dibuja las dos gráficas con datos ya calculados.
+        Matplotlib debe usarse desde el hilo principal, por eso va aparte del cálculo.
+        """
+        import matplotlib.pyplot as plt  # Se carga solo cuando hay que dibujar
+        with fase(self.instrumentacion, 'graficar'):  # Mide el tiempo de dibujo (si se pidió)
             # Crea una figura con dos gráficos lado a lado
             fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
 
             # PRIMER GRÁFICO: La función y dónde está su raíz
-            x_vals = np.linspace(raiz - 3, raiz + 3, 400)  # Puntos alrededor de la raíz
-            y_vals = f(x_vals)  # Valores de la función en esos puntos
-
             ax1.plot(x_vals, y_vals, 'b-', linewidth=2, label=f'f(x) = {expr}')
             ax1.axhline(y=0, color='k', linestyle='--', alpha=0.3)  # Línea horizontal en y=0
             ax1.axvline(x=raiz, color='r', linestyle='--', alpha=0.7, label=f'Raíz: {raiz:.6f}')  # Línea vertical en la raíz
-            ax1.plot(raiz, float(f(raiz)), 'ro', markersize=8, label='Raíz encontrada')  # Punto donde está la raíz
+            ax1.plot(raiz, f_raiz, 'ro', markersize=8, label='Raíz encontrada')  # Punto donde está la raíz
             ax1.set_xlabel('x')
             ax1.set_ylabel('f(x)')
             ax1.set_title('Función y Raíz Encontrada')
@@ -312,10 +1190,6 @@ las raíces de una función real. Fórmula: xₙ₊₁ = xₙ - f(xₙ)/f'(xₙ)
             plt.tight_layout()  # Ajusta automáticamente el espaciado
             plt.show()  # Muestra las gráficas en pantalla
 
-        except Exception as e:
-            # Si hay algún problema, muestra un error amigable
-            messagebox.showerror("Error", f"Error al graficar: {str(e)}")
-
     def clear_fields(self):
         """
         Resetea todos los campos de la interfaz a sus valores por defecto.
@@ -332,8 +1206,10 @@ las raíces de una función real. Fórmula: xₙ₊₁ = xₙ - f(xₙ)/f'(xₙ)
         self.tol_entry.insert(0, "1e-6")
         self.max_iter_entry.delete(0, tk.END)
         self.max_iter_entry.insert(0, "100")
+        self.metodo_combo.set('Newton-Raphson')
         
-        # Limpia el área de resultados
+        # Limpia el área de resultados (y descarta lotes pendientes de la tabla anterior)
+        self._tabla_actual = None
         self.results_text.delete(1.0, tk.END)
 
     def run(self):
@@ -342,6 +1218,9 @@ las raíces de una función real. Fórmula: xₙ₊₁ = xₙ - f(xₙ)/f'(xₙ)
         Esta función no termina hasta que el usuario cierre la ventana.
         """
         self.root.mainloop()
+        # Al cerrar la ventana, detenemos cualquier cálculo pendiente
+        self._cancelar.set()
+        self._executor.shutdown(wait=False)
 
 
 # ===== EJEMPLO SIN INTERFAZ GRÁFICA =====
@@ -1,152 +1,628 @@
+from functools import cached_property
+
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-from typing import Callable, Optional
+from typing import TYPE_CHECKING, Callable, Optional
+
+# pandas y matplotlib tardan en cargarse: se importan solo al pedir la tabla o la
+# gráfica, para que los cálculos sin interfaz (lotes, procesos de trabajo) arranquen rápido
+if TYPE_CHECKING:
+    import pandas as pd
+
+from instrumentacion import contar, fase
+from motor_expresiones import compilar_expresion, version_escalar
+from richardson import extrapolar
+from graficas import indices_reducidos, mostrar_o_guardar, nueva_figura
+
+# Tabla de Butcher de Dormand-Prince 5(4) para el modo adaptativo.
+# La última fila de A coincide con los pesos de orden 5 (propiedad FSAL):
+# la última etapa de un paso aceptado es la primera del siguiente.
+_DP_C = np.array([0.0, 1/5, 3/10, 4/5, 8/9, 1.0, 1.0])
+_DP_A = np.array([
+    [0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+    [1/5, 0.0, 0.0, 0.0, 0.0, 0.0],
+    [3/40, 9/40, 0.0, 0.0, 0.0, 0.0],
+    [44/45, -56/15, 32/9, 0.0, 0.0, 0.0],
+    [19372/6561, -25360/2187, 64448/6561, -212/729, 0.0, 0.0],
+    [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656, 0.0],
+    [35/384, 0.0, 500/1113, 125/192, -2187/6784, 11/84],
+])
+# Diferencia entre los pesos de orden 5 y los de orden 4 (estimación del error local)
+_DP_E = np.array([35/384 - 5179/57600, 0.0, 500/1113 - 7571/16695, 125/192 - 393/640,
+                  -2187/6784 + 92097/339200, 11/84 - 187/2100, -1/40])
+
+def _state_columns(name: str, n_state: int, is_system: bool) -> list:
+    """Nombres de columna: 'y_RK4' para EDOs escalares, 'y_RK4[0]', ... para sistemas."""
+    if not is_system:
+        return [name]
+    return [f"{name}[{j}]" for j in range(n_state)]
+
+
+class DenseOutput:
+    """
+    Salida densa: interpolante de Hermite cúbico por tramos construido con los
+    valores y las pendientes f(x, y) de cada nodo (k1 de cada paso de RK4, que
+    el solver ya calcula). Se evalúa en cualquier x dentro del intervalo
+    resuelto sin volver a integrar. Para mallas uniformes solo guarda x0 y h.
+    """
+    def __init__(self, x: np.ndarray, y_values: np.ndarray, slopes: np.ndarray,
+                 is_system: bool, h: Optional[float] = None):
+        # Malla uniforme: x se reconstruye como x0 + i*h en lugar de guardarla
+        self.x0, self.h = float(x[0]), h
+        self.nodes = None if h is not None else x
+        self.x_last = float(x[-1])
+        self.y_values = y_values  # (nodos, n_estado)
+        self.slopes = slopes      # (nodos, n_estado)
+        self.is_system = is_system
+
+    @property
+    def nbytes(self) -> int:
+        extra = 0 if self.nodes is None else self.nodes.nbytes
+        return self.y_values.nbytes + self.slopes.nbytes + extra
+
+    def __call__(self, x_query):
+        xq = np.asarray(x_query, dtype=float)
+        flat = np.atleast_1d(xq).ravel()
+        lo, hi = sorted((self.x0, self.x_last))
+        if np.any((flat < lo - 1e-12 * max(1.0, abs(lo))) | (flat > hi + 1e-12 * max(1.0, abs(hi)))):
+            raise ValueError(f"x fuera del intervalo resuelto [{lo}, {hi}]")
+
+        # Tramo [x_i, x_i+1] que contiene cada punto
+        n_int = len(self.y_values) - 1
+        if self.nodes is None:
+            idx = np.clip(np.floor((flat - self.x0) / self.h).astype(int), 0, n_int - 1)
+            x_i = self.x0 + idx * self.h
+            h_i = np.full(flat.shape, self.h)
+        else:
+            if self.x_last >= self.x0:
+                idx = np.searchsorted(self.nodes, flat, side='right') - 1
+            else:
+                idx = len(self.nodes) - 1 - np.searchsorted(self.nodes[::-1], flat, side='left')
+            idx = np.clip(idx, 0, n_int - 1)
+            x_i = self.nodes[idx]
+            h_i = self.nodes[idx + 1] - x_i
+
+        # Bases de Hermite cúbicas en t = (x - x_i) / h_i
+        t = ((flat - x_i) / h_i)[:, None]
+        t2, t3 = t * t, t * t * t
+        h00, h10 = 2*t3 - 3*t2 + 1, t3 - 2*t2 + t
+        h01, h11 = -2*t3 + 3*t2, t3 - t2
+        hh = h_i[:, None]
+        out = (h00 * self.y_values[idx] + h10 * hh * self.slopes[idx]
+               + h01 * self.y_values[idx + 1] + h11 * hh * self.slopes[idx + 1])
+
+        # Misma forma que la entrada: escalar -> número (o vector en sistemas)
+        if not self.is_system:
+            out = out[:, 0]
+        return out.reshape(xq.shape + out.shape[1:])
+
+
+class RK4Result:
+    """
+    Resultado ligero de una integración: guarda los arreglos de NumPy tal
+    cual salen del solver y solo construye la tabla de pandas si se pide
+    con to_pandas(). x, y, final_value y los errores son vistas sin copia.
+    """
+    def __init__(self, x: np.ndarray, y_values: np.ndarray, is_system: bool,
+                 stages: Optional[np.ndarray] = None,
+                 exact_func: Optional[Callable[[float], float]] = None,
+                 instrumentation=None, error_estimate: Optional[np.ndarray] = None):
+        self.x = x
+        self.y_values = y_values  # Siempre (pasos + 1, n_estado)
+        self.is_system = is_system
+        self.stages = stages      # (4, pasos + 1, n_estado) o None
+        self.y_exact_values = None
+        # Instrumentacion del solver (evaluaciones de f y tiempos por fase) o None
+        self.instrumentation = instrumentation
+        # Error estimado por extrapolación de Richardson (mismo formato que y_values) o None
+        self.error_estimate_values = error_estimate
+        # Salida densa (DenseOutput) si se pidió al resolver con dense=True
+        self.dense = None
+
+        # Evaluamos la solución exacta una sola vez, ya vectorizada sobre x
+        if exact_func and len(x):
+            try:
+                y_exact = exact_func(x)
+                if isinstance(y_exact, (list, tuple)):
+                    # Sistemas: una curva por componente (alguna puede ser constante, ej. "[1, x]")
+                    y_exact = np.column_stack([np.broadcast_to(np.asarray(v, dtype=float), x.shape)
+                                               for v in y_exact])
+                else:
+                    y_exact = np.asarray(y_exact, dtype=float)
+                    y_exact = y_exact.T if y_exact.ndim == 2 else np.broadcast_to(y_exact, x.shape)[:, None]
+                self.y_exact_values = np.broadcast_to(y_exact, y_values.shape)
+            except Exception as e:
+                print(f"No se pudo calcular la solución exacta: {e}")
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    @property
+    def empty(self) -> bool:
+        return len(self.x) == 0
+
+    def _component_view(self, values: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        # EDO escalar: vista 1-D de la única columna; sistema: el arreglo 2-D completo
+        if values is None or self.is_system:
+            return values
+        return values[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self._component_view(self.y_values)
+
+    @property
+    def final_value(self):
+        return self.y[-1]
+
+    @property
+    def y_exact(self) -> Optional[np.ndarray]:
+        return self._component_view(self.y_exact_values)
+
+    @cached_property
+    def _abs_error_values(self) -> Optional[np.ndarray]:
+        if self.y_exact_values is None:
+            return None
+        return np.abs(self.y_exact_values - self.y_values)
+
+    @cached_property
+    def _rel_error_values(self) -> Optional[np.ndarray]:
+        if self.y_exact_values is None:
+            return None
+        # Cálculo seguro del error relativo
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self._abs_error_values / np.abs(self.y_exact_values) * 100
+
+    @property
+    def error_abs(self) -> Optional[np.ndarray]:
+        return self._component_view(self._abs_error_values)
+
+    @property
+    def error_rel(self) -> Optional[np.ndarray]:
+        return self._component_view(self._rel_error_values)
+
+    @property
+    def error_estimate(self) -> Optional[np.ndarray]:
+        return self._component_view(self.error_estimate_values)
+
+    def drop_steps(self) -> Optional[DenseOutput]:
+        """
+        Suelta todos los arreglos por paso del resultado (x, y, k1-k4, solución
+        exacta y errores), que queda vacío, y devuelve la salida densa (o None).
+        La salida densa no ahorra memoria: comparte los valores de y y guarda
+        además una pendiente por nodo (unas 2 veces y). Sirve para evaluar en
+        cualquier x sin guardar también las tablas del resultado.
+        """
+        n_state = self.y_values.shape[1] if self.y_values.ndim == 2 else 0
+        self.x, self.y_values = np.empty(0), np.empty((0, n_state))
+        self.stages = self.y_exact_values = self.error_estimate_values = None
+        self.__dict__.pop('_abs_error_values', None)
+        self.__dict__.pop('_rel_error_values', None)
+        return self.dense
+
+    def to_pandas(self) -> "pd.DataFrame":
+        """Construye la tabla x, y, (k1-k4 si hay etapas) y, si hay solución exacta, sus errores."""
+        with fase(self.instrumentation, 'tabla'):
+            return self._build_dataframe()
+
+    def _build_dataframe(self) -> "pd.DataFrame":
+        import pandas as pd
+        n_state = self.y_values.shape[1] if self.y_values.ndim == 2 else 0
+        # Las columnas se añaden ya en el orden final: k1-k4 antes que los errores
+        data = {'x': self.x}
+        data.update(zip(_state_columns('y_RK4', n_state, self.is_system), self.y_values.T))
+        if self.stages is not None:
+            for name, k_values in zip(('k1', 'k2', 'k3', 'k4'), self.stages):
+                data.update(zip(_state_columns(name, n_state, self.is_system), k_values.T))
+        if self.error_estimate_values is not None:
+            data.update(zip(_state_columns('Error Est.', n_state, self.is_system),
+                            self.error_estimate_values.T))
+        if self.y_exact_values is not None:
+            for name, values in (('y_Exacta', self.y_exact_values),
+                                 ('Error Abs', self._abs_error_values),
+                                 ('Err Rel(%)', self._rel_error_values)):
+                data.update(zip(_state_columns(name, n_state, self.is_system), values.T))
+        return pd.DataFrame(data)
+
 
 class RungeKuttaSolver:
     """
     Solver profesional para EDOs con RK4.
     Muestra pasos intermedios (k1-k4) y genera gráficos.
+    Los métodos solve* devuelven un RK4Result; la tabla se pide con to_pandas().
+    Con una Instrumentacion (ver instrumentacion.py) se cuentan las evaluaciones
+    de f, se miden las fases y se llama a su función por_paso(i, x, y) en cada paso.
     """
-    def __init__(self, f: Callable[[float, float], float], label: str = "y(x)"):
+    def __init__(self, f: Callable[[float, float], float], label: str = "y(x)",
+                 instrumentation=None):
         self.f = f
         self.label = label
         self.results = None
+        self.instrumentation = instrumentation
+
+    def _instrumented(self, scalar: bool = False):
+        """
+        f (contada si hay instrumentación) y la función por paso (o None).
+        Con scalar=True, si f viene de parse_math_function se usa su versión
+        escalar (con `math`), más rápida para EDOs de una sola ecuación.
+        """
+        inst = self.instrumentation
+        f = version_escalar(self.f) if scalar else self.f
+        return contar(inst, f, 'f'), (inst.por_paso if inst is not None else None)
 
-    def solve(self, x0: float, y0: float, h: float, x_end: float, 
-              exact_func: Optional[Callable[[float], float]] = None) -> pd.DataFrame:
+    def solve(self, x0: float, y0, h: float, x_end: float,
+              exact_func: Optional[Callable[[float], float]] = None,
+              trace_stages: bool = False, dense: bool = False) -> RK4Result:
+        """
+        Integra con RK4 de paso fijo. `y0` puede ser un número o un vector
+        (sistema de EDOs); en ese caso f(x, y) debe devolver un vector del
+        mismo tamaño y la tabla tendrá una columna por componente.
+        Con trace_stages=True la tabla incluye las pendientes k1-k4 de cada paso.
+        Con dense=True el resultado trae `dense`, un interpolante que se evalúa
+        en cualquier x del intervalo (con las k1 de cada paso, sin integrar de nuevo).
+        """
         
         # Calcular número de pasos
         try:
             steps = int(np.ceil(abs(x_end - x0) / h))
         except ZeroDivisionError:
             print("Error: El paso h no puede ser 0.")
-            return pd.DataFrame()
+            return RK4Result(np.empty(0), np.empty((0, 0)), False)
 
-        # Inicialización de Arrays para x e y
+        is_system = np.ndim(y0) > 0
+        y0_vec = np.atleast_1d(np.asarray(y0, dtype=float))
+        n_state = y0_vec.size
+
+        # Inicialización de Arrays para x e y: y siempre es (pasos + 1, n_estado)
         x_values = np.zeros(steps + 1)
-        y_values = np.zeros(steps + 1)
+        y_values = np.zeros((steps + 1, n_state))
         x_values[0] = x0
-        y_values[0] = y0
-        
-        # Listas para almacenar las pendientes intermedias
-        # Se llenarán paso a paso
-        k1_list = []
-        k2_list = []
-        k3_list = []
-        k4_list = []
+        y_values[0] = y0_vec
+
+        # Pendientes intermedias (solo si se piden): arreglo (4, pasos + 1, n_estado)
+        # lleno de NaN, porque en el último punto ya no calculamos pendientes.
+        stages = np.full((4, steps + 1, n_state), np.nan) if trace_stages else None
+        # Pendiente f(x, y) en cada nodo para la salida densa
+        slopes = np.empty((steps + 1, n_state)) if dense else None
         
+        f, on_step = self._instrumented(scalar=not is_system)
         print(f"\nProcesando... (x0={x0}, y0={y0}, h={h}, pasos={steps})")
         
+        with fase(self.instrumentation, 'integrar'):
+            if is_system:
+                done = self._steps_system(f, h, steps, x_values, y_values, stages, slopes, on_step)
+            else:
+                done = self._steps_scalar(f, h, steps, x_values, y_values, stages, slopes, on_step)
+
+        # --- RESULTADO (la tabla de pandas solo se construye si se pide) ---
+        # Si hubo un error, solo se conservan los pasos completados (sin las filas en cero)
+        x_values, y_values = x_values[:done + 1], y_values[:done + 1]
+        if stages is not None:
+            stages = stages[:, :done + 1]
+        self.results = RK4Result(x_values, y_values, is_system, stages, exact_func, self.instrumentation)
+        if dense:
+            self.results.dense = self._dense_output(f, x_values, y_values, slopes[:done + 1], is_system, h)
+        return self.results
+
+    @staticmethod
+    def _steps_scalar(f, h, steps, x_values, y_values, stages, slopes, on_step) -> int:
+        """
+        Bucle RK4 para una EDO escalar: aritmética con floats de Python, que para
+        un solo valor es mucho más rápida que operar sobre vectores de tamaño 1.
+        Devuelve los pasos completados (menos que `steps` si hubo un error).
+        """
+        xi, yi = float(x_values[0]), float(y_values[0, 0])
+        half_h, sixth_h = 0.5 * h, h / 6.0
+        for i in range(steps):
+            try:
+                # --- PASO 1: Calcular pendientes ---
+                k1 = float(f(xi, yi))
+                k2 = float(f(xi + half_h, yi + half_h * k1))
+                k3 = float(f(xi + half_h, yi + half_h * k2))
+                k4 = float(f(xi + h, yi + h * k3))
+
+                # --- PASO 2: Promedio ponderado y avance ---
+                yi = yi + sixth_h * (k1 + 2.0 * k2 + 2.0 * k3 + k4)
+                xi = xi + h
+            except Exception as e:
+                print(f"Error matemático en el paso {i}: {e}")
+                return i
+
+            if stages is not None:
+                stages[:, i, 0] = (k1, k2, k3, k4)
+            if slopes is not None:
+                slopes[i, 0] = k1
+            x_values[i + 1] = xi
+            y_values[i + 1, 0] = yi
+            if on_step is not None:
+                on_step(i + 1, xi, yi)
+        return steps
+
+    @staticmethod
+    def _steps_system(f, h, steps, x_values, y_values, stages, slopes, on_step) -> int:
+        """
+        Bucle RK4 para sistemas: las etapas se calculan en vectores (n_estado,)
+        reservados una sola vez, sin asignaciones por paso.
+        Devuelve los pasos completados (menos que `steps` si hubo un error).
+        """
+        n_state = y_values.shape[1]
+        k1, k2, k3, k4 = (np.empty(n_state) for _ in range(4))
+        y_stage = np.empty(n_state)
         for i in range(steps):
             xi = x_values[i]
             yi = y_values[i]
-            
+            if stages is not None:
+                # Las k se escriben directamente en su fila de la tabla
+                k1, k2, k3, k4 = stages[:, i]
+
             try:
                 # --- PASO 1: Calcular pendientes ---
-                k1 = self.f(xi, yi)
-                k2 = self.f(xi + 0.5 * h, yi + 0.5 * h * k1)
-                k3 = self.f(xi + 0.5 * h, yi + 0.5 * h * k2)
-                k4 = self.f(xi + h, yi + h * k3)
-                
-                # Guardamos las k para verlas en la tabla
-                k1_list.append(k1)
-                k2_list.append(k2)
-                k3_list.append(k3)
-                k4_list.append(k4)
-                
+                k1[:] = f(xi, yi)
+                if slopes is not None:
+                    slopes[i] = k1
+                np.multiply(k1, 0.5 * h, out=y_stage)
+                y_stage += yi
+                k2[:] = f(xi + 0.5 * h, y_stage)
+                np.multiply(k2, 0.5 * h, out=y_stage)
+                y_stage += yi
+                k3[:] = f(xi + 0.5 * h, y_stage)
+                np.multiply(k3, h, out=y_stage)
+                y_stage += yi
+                k4[:] = f(xi + h, y_stage)
+
                 # --- PASO 2: Promedio ponderado y avance ---
-                y_next = yi + (h / 6.0) * (k1 + 2*k2 + 2*k3 + k4)
-                
+                # y_next = yi + (h / 6) * (k1 + 2*k2 + 2*k3 + k4), escrito en su fila
+                y_next = y_values[i+1]
+                np.add(k2, k3, out=y_next)
+                y_next *= 2.0
+                y_next += k1
+                y_next += k4
+                y_next *= h / 6.0
+                y_next += yi
+
                 x_values[i+1] = xi + h
-                y_values[i+1] = y_next
-                
+                if on_step is not None:
+                    on_step(i + 1, x_values[i+1], y_next)
+
             except Exception as e:
                 print(f"Error matemático en el paso {i}: {e}")
-                break
+                return i
+        return steps
 
-        # Rellenamos el último valor de las K con NaN (Not a Number)
-        # porque en el último punto ya no calculamos pendientes siguientes.
-        k1_list.append(None)
-        k2_list.append(None)
-        k3_list.append(None)
-        k4_list.append(None)
-
-        # --- CONSTRUCCIÓN DE LA TABLA COMPLETA ---
-        data = {
-            'x': x_values,
-            'y_RK4': y_values,
-            'k1': k1_list,
-            'k2': k2_list,
-            'k3': k3_list,
-            'k4': k4_list
-        }
-        
-        # Calcular errores si hay solución exacta
-        if exact_func:
-            try:
-                y_exact = exact_func(x_values)
-                data['y_Exacta'] = y_exact
-                data['Error Abs'] = np.abs(y_exact - y_values)
-                # Cálculo seguro del error relativo
-                with np.errstate(divide='ignore', invalid='ignore'):
-                    data['Err Rel(%)'] = np.abs((y_exact - y_values) / y_exact) * 100
-            except Exception as e:
-                print(f"No se pudo calcular la solución exacta: {e}")
-            
-        self.results = pd.DataFrame(data)
-        
-        # Reordenar columnas para que k1-k4 salgan antes que los errores (estética)
-        cols = ['x', 'y_RK4', 'k1', 'k2', 'k3', 'k4']
-        if 'y_Exacta' in data:
-            cols += ['y_Exacta', 'Error Abs', 'Err Rel(%)']
-        self.results = self.results[cols]
-        
+    @staticmethod
+    def _dense_output(f, x_values, y_values, slopes, is_system, h=None) -> Optional[DenseOutput]:
+        """Completa la pendiente del último nodo y construye la salida densa."""
+        if len(x_values) < 2:
+            return None
+        try:
+            slopes[-1] = f(x_values[-1], y_values[-1] if is_system else y_values[-1, 0])
+        except Exception as e:
+            print(f"No se pudo construir la salida densa: {e}")
+            return None
+        return DenseOutput(x_values, y_values, slopes, is_system, h)
+
+    def solve_adaptive(self, x0: float, y0, x_end: float, rtol: float = 1e-6, atol: float = 1e-9,
+                       h0: Optional[float] = None, max_steps: int = 100000,
+                       exact_func: Optional[Callable[[float], float]] = None,
+                       dense: bool = False) -> RK4Result:
+        """
+        Integra con Dormand-Prince 5(4) y paso adaptativo: cada paso se acepta
+        o se rechaza según el error local estimado frente a atol + rtol*|y|.
+        Devuelve el mismo tipo de resultado que solve() sin trazar etapas: las
+        de Dormand-Prince no corresponden a las k1-k4 de RK4.
+        Con dense=True también construye la salida densa sobre la malla no uniforme
+        (la pendiente de cada nodo es la etapa FSAL, así que no cuesta evaluaciones extra).
+        """
+        direction = np.sign(x_end - x0)
+        if direction == 0:
+            print("Error: x0 y x_end no pueden ser iguales.")
+            return RK4Result(np.empty(0), np.empty((0, 0)), False)
+
+        is_system = np.ndim(y0) > 0
+        y = np.atleast_1d(np.asarray(y0, dtype=float)).copy()
+        n_state = y.size
+        stage_arg = (lambda v: v) if is_system else (lambda v: v[0])
+
+        # Paso inicial: el dado por el usuario o una fracción del intervalo
+        h = abs(h0) if h0 else 0.01 * abs(x_end - x0)
+
+        # Etapas K (7 x n_estado) y vector de trabajo, reservados una sola vez
+        K = np.empty((7, n_state))
+        y_stage = np.empty(n_state)
+
+        x = x0
+        x_list = [x0]
+        y_list = [y.copy()]
+        f, on_step = self._instrumented(scalar=not is_system)
+        K[0] = f(x, stage_arg(y))
+        slope_list = [K[0].copy()] if dense else None
+        n_eval, accepted, rejected = 1, 0, 0
+
+        print(f"\nProcesando (adaptativo)... (x0={x0}, y0={y0}, rtol={rtol}, atol={atol})")
+
+        with fase(self.instrumentation, 'integrar'):
+            while direction * (x_end - x) > 0:
+                if accepted + rejected >= max_steps:
+                    print(f"Aviso: se alcanzó el máximo de {max_steps} pasos antes de x_end.")
+                    break
+
+                # No pasarnos de x_end: el último paso se recorta exactamente
+                remaining = abs(x_end - x)
+                last = h >= remaining
+                hs = direction * (remaining if last else h)
+
+                try:
+                    for i in range(1, 7):
+                        np.dot(_DP_A[i, :i], K[:i], out=y_stage)
+                        y_stage *= hs
+                        y_stage += y
+                        K[i] = f(x + _DP_C[i] * hs, stage_arg(y_stage))
+                    n_eval += 6
+                except Exception as e:
+                    print(f"Error matemático cerca de x={x}: {e}")
+                    break
+
+                # y_stage contiene ahora la solución de orden 5; K[6] = f(x + h, y5)
+                err_vec = hs * (_DP_E @ K)
+                scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_stage))
+                err = np.sqrt(np.mean((err_vec / scale) ** 2))
+
+                if err <= 1.0:
+                    x = x_end if last else x + hs
+                    y[:] = y_stage
+                    K[0] = K[6]  # FSAL: reutilizamos la última evaluación
+                    if slope_list is not None:
+                        slope_list.append(K[6].copy())
+                    accepted += 1
+                    x_list.append(x)
+                    y_list.append(y.copy())
+                    if on_step is not None:
+                        on_step(accepted, x, stage_arg(y))
+                    factor = 5.0 if err == 0 else min(5.0, 0.9 * err ** -0.2)
+                else:
+                    rejected += 1
+                    factor = max(0.2, 0.9 * err ** -0.2)
+                h = abs(hs) * factor
+
+        print(f"Pasos aceptados: {accepted}, rechazados: {rejected}, evaluaciones de f: {n_eval}")
+
+        x_values = np.array(x_list)
+        y_values = np.array(y_list)
+        self.results = RK4Result(x_values, y_values, is_system, None, exact_func, self.instrumentation)
+        if dense and len(x_values) > 1:
+            self.results.dense = DenseOutput(x_values, y_values, np.array(slope_list), is_system)
+        return self.results
+
+    def solve_richardson(self, x0: float, y0, h: float, x_end: float, levels: int = 2,
+                         exact_func: Optional[Callable[[float], float]] = None) -> RK4Result:
+        """
+        Extrapolación de Richardson: resuelve con h, h/2, ..., h/2^(levels-1) y
+        combina los resultados en los puntos de la malla de paso h. El resultado
+        incluye la estimación del error (columna 'Error Est.' de la tabla).
+        Requiere que (x_end - x0) sea múltiplo de h para que las mallas coincidan.
+        """
+        runs = []
+        for k in range(levels):
+            res = self.solve(x0, y0, h / 2**k, x_end)
+            # Tomamos solo los puntos de la malla gruesa: uno de cada 2^k
+            runs.append(res.y_values[::2**k])
+            if k == 0:
+                coarse = res
+            if res.empty or runs[-1].shape != runs[0].shape:
+                print("Error: una integración se detuvo o las mallas no coinciden; (x_end - x0) debe ser múltiplo de h.")
+                return RK4Result(np.empty(0), np.empty((0, 0)), False)
+
+        y_values, error = extrapolar(runs, orden=4)
+        self.results = RK4Result(coarse.x, y_values, coarse.is_system, None, exact_func,
+                                 self.instrumentation, error)
         return self.results
 
-    def plot(self):
+    def solve_ensemble(self, x0: float, y0, h: float, x_end: float,
+                       params: Optional[dict] = None):
+        """
+        Integra muchas condiciones iniciales a la vez con RK4.
+        `y0` es un arreglo de valores iniciales y `params` un diccionario
+        opcional {nombre: arreglo} que se pasa a f(x, y, **params); todo se
+        combina con broadcasting de NumPy.
+        Devuelve (x_values, y_values) con y_values de forma (pasos + 1, n).
+        """
+        params = {} if params is None else params
+        try:
+            steps = int(np.ceil(abs(x_end - x0) / h))
+        except ZeroDivisionError:
+            print("Error: El paso h no puede ser 0.")
+            return np.empty(0), np.empty((0, 0))
+
+        # Llevamos y0 y los parámetros a una forma común (n trayectorias)
+        arrays = np.broadcast_arrays(np.atleast_1d(np.asarray(y0, dtype=float)),
+                                     *[np.asarray(v, dtype=float) for v in params.values()])
+        y = arrays[0].copy()
+        params = dict(zip(params.keys(), arrays[1:]))
+
+        x_values = x0 + h * np.arange(steps + 1)
+        y_values = np.full((steps + 1, y.size), np.nan)
+        y_values[0] = y
+
+        f, on_step = self._instrumented()
+        print(f"\nProcesando ensamble... (n={y.size}, h={h}, pasos={steps})")
+
+        with fase(self.instrumentation, 'integrar'):
+            for i in range(steps):
+                xi = x_values[i]
+                try:
+                    k1 = f(xi, y, **params)
+                    k2 = f(xi + 0.5 * h, y + 0.5 * h * k1, **params)
+                    k3 = f(xi + 0.5 * h, y + 0.5 * h * k2, **params)
+                    k4 = f(xi + h, y + h * k3, **params)
+                    y = y + (h / 6.0) * (k1 + 2*k2 + 2*k3 + k4)
+                    y_values[i+1] = y
+                    if on_step is not None:
+                        on_step(i + 1, x_values[i+1], y)
+                except Exception as e:
+                    print(f"Error matemático en el paso {i}: {e}")
+                    break
+
+        return x_values, y_values
+
+    def plot(self, path: Optional[str] = None):
+        """
+        Grafica el último resultado. Con `path` (p. ej. "rk4.png" o "rk4.svg")
+        se dibuja sin pantalla (lienzo Agg propio, sin cambiar el backend de
+        pyplot) y se guarda en ese archivo.
+        """
         if self.results is None or self.results.empty:
             print("No hay resultados para graficar.")
             return
 
-        plt.figure(figsize=(10, 6))
-        plt.plot(self.results['x'], self.results['y_RK4'], 'o--', label='Aproximación RK4', color='crimson')
-        
-        if 'y_Exacta' in self.results.columns:
-            plt.plot(self.results['x'], self.results['y_Exacta'], 'b-', label='Solución Exacta', alpha=0.6, linewidth=2)
-            plt.fill_between(self.results['x'], self.results['y_RK4'], self.results['y_Exacta'], color='gray', alpha=0.1)
+        with fase(self.instrumentation, 'graficar'):
+            self._draw(path)
+
+    def _draw(self, path: Optional[str] = None):
+        res = self.results
+        # Con muchos puntos dibujamos solo el mínimo y el máximo de cada tramo
+        # (mismos índices para la aproximación y la exacta) y sin marcadores
+        idx = indices_reducidos(res.y_values)
+        marker = 'o--' if len(idx) == len(res.x) else '--'
+        x = res.x[idx]
+        fig, ax = nueva_figura(path, figsize=(10, 6))
+        # En sistemas hay una curva por componente: y_RK4[0], y_RK4[1], ...
+        suffixes = _state_columns('', res.y_values.shape[1], res.is_system)
+        for j, suffix in enumerate(suffixes):
+            y = res.y_values[idx, j]
+            ax.plot(x, y, marker, label=f'Aproximación RK4{suffix}',
+                    color=None if suffix else 'crimson')
 
-        plt.title(f"Método RK4: {self.label}")
-        plt.xlabel("x")
-        plt.ylabel("y")
-        plt.grid(True, linestyle='--', alpha=0.7)
-        plt.legend()
-        plt.show()
+            if res.y_exact_values is not None:
+                y_exact = res.y_exact_values[idx, j]
+                ax.plot(x, y_exact, '-', label=f'Solución Exacta{suffix}',
+                        alpha=0.6, linewidth=2, color=None if suffix else 'b')
+                ax.fill_between(x, y, y_exact, color='gray', alpha=0.1)
+
+        ax.set_title(f"Método RK4: {self.label}")
+        ax.set_xlabel("x")
+        ax.set_ylabel("y")
+        ax.grid(True, linestyle='--', alpha=0.7)
+        ax.legend()
+        mostrar_o_guardar(fig, path)
 
 # --- FUNCIONES DE INTERFAZ DE USUARIO ---
 
-def parse_math_function(func_str):
-    """Convierte texto a función matemática segura."""
-    safe_dict = {
-        "x": 0, "y": 0,
-        "sin": np.sin, "cos": np.cos, "tan": np.tan, "exp": np.exp, 
-        "sqrt": np.sqrt, "log": np.log, "pi": np.pi, "e": np.e, 
-        "abs": np.abs, "np": np
-    }
-    
-    def func(x, y=None):
-        local_scope = safe_dict.copy()
-        local_scope['x'] = x
-        if y is not None: local_scope['y'] = y
-        return eval(func_str, {"__builtins__": None}, local_scope)
-    
-    return func
+def parse_math_function(func_str, params=(), instrumentation=None):
+    """
+    Convierte texto a función matemática segura f(x, y=0) usando el motor de
+    expresiones compartido (compilada una sola vez). Al llamarla se usa la versión
+    vectorial con NumPy (sistemas, ensambles, gráficas); el solver usa su versión
+    `.escalar` con `math` para las EDOs de una sola ecuación.
+    `params` son nombres extra (p. ej. ('k',)) que se pasan como f(x, y, k=...).
+    """
+    with fase(instrumentation, 'parsear'):
+        return compilar_expresion(func_str, ('x', 'y'), tuple(params))
 
 def get_user_input():
     print("\n" + "="*50)
     print("  SOLUCIONADOR RK4 PROFESIONAL (Con detalle de pasos)")
     print("="*50)
-    print("Sintaxis: Potencias con '**', Raíz con 'sqrt()', etc.")
+    print("Sintaxis: Potencias con '**' o '^', Raíz con 'sqrt()', etc.")
+    print("Sistemas: usa una lista con y[0], y[1], ... por ejemplo [y[1], -y[0]]")
     print("-" * 50)
 
     # 1. Entrada de Ecuación
@@ -154,7 +630,11 @@ def get_user_input():
         eq_str = input("\nIntroduce la EDO dy/dx = f(x, y): ")
         try:
             test_f = parse_math_function(eq_str)
-            test_f(1.0, 1.0) 
+            try:
+                test_f(1.0, 1.0)
+            except (TypeError, IndexError):
+                # Puede ser un sistema: lo probamos con un vector
+                test_f(1.0, np.ones(10))
             user_f = test_f
             break
         except Exception as e:
@@ -163,7 +643,9 @@ def get_user_input():
     # 2. Parámetros
     try:
         x0 = float(input("Introduce el valor inicial x0:      "))
-        y0 = float(input("Introduce el valor inicial y0 (y(x0)): "))
+        # Varios valores separados por comas para sistemas (ej. "1, 0")
+        y0_values = [float(v) for v in input("Introduce el valor inicial y0 (y(x0)): ").split(',')]
+        y0 = y0_values[0] if len(y0_values) == 1 else np.array(y0_values)
         h = float(input("Introduce el tamaño de paso (h):     "))
         x_end = float(input("Introduce el valor final de x:       "))
     except ValueError:
@@ -186,9 +668,10 @@ def get_user_input():
 
     # --- EJECUCIÓN ---
     solver = RungeKuttaSolver(f=user_f, label=f"dy/dx = {eq_str}")
-    df = solver.solve(x0, y0, h, x_end, exact_func=exact_f)
+    df = solver.solve(x0, y0, h, x_end, exact_func=exact_f, trace_stages=True).to_pandas()
     
     print("\n" + "="*20 + " RESULTADOS DETALLADOS " + "="*20)
+    import pandas as pd
     # Configuración para que Pandas muestre bien los decimales
     pd.set_option('display.max_columns', None)
     pd.set_option('display.width', 1000)
@@ -0,0 +1,226 @@
+"""
+Pruebas de rendimiento de los tres métodos (Euler, RK4 y Newton-Raphson).
+
+Resuelve siempre los mismos problemas de referencia con distintos números de pasos
+y mide el tiempo. No abre ventanas ni gráficas, así que se puede correr en un
+servidor. Los resultados se guardan en JSON para compararlos con corridas anteriores:
+
+    python benchmarks.py --salida base.json
+    python benchmarks.py --salida nuevo.json --comparar base.json
+
+También mide cuánto tarda en arrancar un proceso nuevo que solo importa cada
+método, y falla (código de salida 1) si alguno carga pandas, matplotlib, sympy o
+tkinter al importarse, o si tarda más que --limite-arranque segundos.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from cargador import cargar_metodo, silencio, sin_ventanas
+
+# Sin pantalla: matplotlib no debe intentar abrir ventanas
+sin_ventanas()
+
+# Problemas de referencia para las EDOs: (nombre, f(x, y), y0, x0, x_final)
+PROBLEMAS_EDO = [
+    ('decaimiento_exponencial', '-2*y', 1.0, 0.0, 5.0),
+    ('crecimiento_logistico', 'y*(1 - y)', 0.1, 0.0, 10.0),
+    ('lineal_rigida', '-50*(y - cos(x))', 0.0, 0.0, 1.0),
+]
+
+# Evaluaciones de f por paso de cada método
+EVALUACIONES_POR_PASO = {'euler': 1, 'rk4': 4}
+
+# Bibliotecas que solo deben cargarse al pedir tablas, gráficas o la interfaz
+MODULOS_PESADOS = ('pandas', 'matplotlib', 'sympy', 'tkinter')
+
+# Programa que corre cada proceso nuevo: importa un método y mide cuánto tardó
+_PROGRAMA_ARRANQUE = """
+import json, sys, time
+inicio = time.perf_counter()
+from cargador import cargar_metodo
+cargar_metodo({metodo!r})
+tiempo = time.perf_counter() - inicio
+print(json.dumps({{'tiempo_s': tiempo,
+                  'pesados': [m for m in {pesados!r} if m in sys.modules]}}))
+"""
+
+
+def _mejor_tiempo(funcion, repeticiones):
+    """Ejecuta `funcion` varias veces (sin imprimir nada) y devuelve el menor tiempo."""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        with silencio():
+            inicio = time.perf_counter()
+            funcion()
+            mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def medir_edos(lista_pasos, repeticiones):
+    """Mide metodo_euler y RungeKuttaSolver.solve sobre los problemas de referencia."""
+    euler = cargar_metodo('euler')
+    rk4 = cargar_metodo('rk4')
+    resultados = []
+
+    for nombre, f_str, y0, x0, x_final in PROBLEMAS_EDO:
+        f_euler = euler.create_function(f_str, ['x', 'y'])
+        solver = rk4.RungeKuttaSolver(rk4.parse_math_function(f_str))
+
+        for pasos in lista_pasos:
+            h = (x_final - x0) / pasos
+            corridas = {
+                'euler': lambda: euler.metodo_euler(f_euler, x0, y0, h, x_final, mostrar_tabla=False),
+                'rk4': lambda: solver.solve(x0, y0, h, x_final),
+            }
+            for metodo, correr in corridas.items():
+                tiempo = _mejor_tiempo(correr, repeticiones)
+                resultados.append({
+                    'metodo': metodo,
+                    'problema': nombre,
+                    'pasos': pasos,
+                    'tiempo_s': tiempo,
+                    'pasos_por_s': pasos / tiempo,
+                    'evaluaciones_f_por_s': pasos * EVALUACIONES_POR_PASO[metodo] / tiempo,
+                })
+    return resultados
+
+
+def medir_newton(repeticiones, corridas=2000):
+    """
+    Mide newton_raphson con el problema de ejemplo_newton_raphson (x³ - 2x - 5, x0 = 2),
+    una vez con las funciones escritas a mano y otra con las que genera el motor de expresiones.
+    """
+    newton = cargar_metodo('newton')
+    from motor_expresiones import compilar_expresion
+
+    funciones = {
+        'a_mano': (lambda x: x**3 - 2*x - 5, lambda x: 3*x**2 - 2),
+        'motor_expresiones': (compilar_expresion('x**3 - 2*x - 5', ('x',)),
+                              compilar_expresion('3*x**2 - 2', ('x',))),
+    }
+    resultados = []
+    for nombre, (f, f_prime) in funciones.items():
+        _, iteraciones = newton.newton_raphson(f, f_prime, 2.0, 1e-12, 100)
+
+        def correr():
+            for _ in range(corridas):
+                newton.newton_raphson(f, f_prime, 2.0, 1e-12, 100)
+
+        tiempo = _mejor_tiempo(correr, repeticiones)
+        total = corridas * len(iteraciones)
+        resultados.append({
+            'metodo': 'newton',
+            'problema': f'x**3 - 2*x - 5 ({nombre})',
+            'pasos': total,
+            'tiempo_s': tiempo,
+            'iteraciones_por_s': total / tiempo,
+            'evaluaciones_f_por_s': 2 * total / tiempo,  # f y f' en cada iteración
+        })
+    return resultados
+
+
+def medir_arranque(repeticiones):
+    """
+    Para cada método, lanza procesos nuevos de Python que solo lo importan y toma
+    el menor tiempo. Así se mide lo que paga cada proceso de trabajo de corta vida.
+    """
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    resultados = []
+    for metodo in ('euler', 'rk4', 'newton'):
+        programa = _PROGRAMA_ARRANQUE.format(metodo=metodo, pesados=MODULOS_PESADOS)
+        mejor = None
+        for _ in range(repeticiones):
+            salida = subprocess.run([sys.executable, '-c', programa], cwd=directorio,
+                                    capture_output=True, text=True, check=True)
+            medicion = json.loads(salida.stdout.strip().splitlines()[-1])
+            if mejor is None or medicion['tiempo_s'] < mejor['tiempo_s']:
+                mejor = medicion
+        resultados.append({
+            'metodo': metodo,
+            'problema': 'arranque (importar el método)',
+            'pasos': 1,
+            'tiempo_s': mejor['tiempo_s'],
+            'modulos_pesados': mejor['pesados'],
+        })
+    return resultados
+
+
+def revisar_arranque(resultados, limite):
+    """Imprime los problemas de arranque encontrados y devuelve True si todo está bien."""
+    correcto = True
+    for r in resultados:
+        if r['modulos_pesados']:
+            print(f"ERROR: importar '{r['metodo']}' carga {', '.join(r['modulos_pesados'])}")
+            correcto = False
+        if r['tiempo_s'] > limite:
+            print(f"ERROR: importar '{r['metodo']}' tarda {r['tiempo_s']:.3f} s (límite {limite} s)")
+            correcto = False
+    return correcto
+
+
+def comparar(actuales, anteriores):
+    """Imprime cuánto cambió cada medición respecto de un JSON anterior (>1 = más rápido)."""
+    clave = lambda r: (r['metodo'], r['problema'], r['pasos'])
+    base = {clave(r): r for r in anteriores['resultados']}
+    print(f"\n{'Método':<8} {'Problema':<40} {'Pasos':>9} {'Aceleración':>12}")
+    print("-" * 72)
+    for r in actuales:
+        previo = base.get(clave(r))
+        if previo is None:
+            continue
+        print(f"{r['metodo']:<8} {r['problema']:<40} {r['pasos']:>9} "
+              f"{previo['tiempo_s'] / r['tiempo_s']:>11.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pasos', type=int, nargs='+', default=[100, 1000, 10000, 100000],
+                        help="números de pasos a medir para Euler y RK4")
+    parser.add_argument('--repeticiones', type=int, default=3,
+                        help="se toma el mejor tiempo de estas repeticiones")
+    parser.add_argument('--salida', default='benchmarks.json', help="archivo JSON de resultados")
+    parser.add_argument('--comparar', help="JSON de una corrida anterior para comparar")
+    parser.add_argument('--limite-arranque', type=float, default=0.5,
+                        help="segundos máximos para importar cada método en un proceso nuevo")
+    args = parser.parse_args(argv)
+
+    arranque = medir_arranque(args.repeticiones)
+    resultados = medir_edos(args.pasos, args.repeticiones) + medir_newton(args.repeticiones) + arranque
+
+    # Tabla resumen en la terminal
+    print(f"{'Método':<8} {'Problema':<40} {'Pasos':>9} {'Tiempo (s)':>11} {'Pasos/s':>12}")
+    print("-" * 84)
+    for r in resultados:
+        velocidad = r.get('pasos_por_s', r.get('iteraciones_por_s'))
+        velocidad = '' if velocidad is None else f"{velocidad:.0f}"
+        print(f"{r['metodo']:<8} {r['problema']:<40} {r['pasos']:>9} {r['tiempo_s']:>11.4f} {velocidad:>12}")
+
+    informe = {
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'plataforma': platform.platform(),
+        'resultados': resultados,
+    }
+    with open(args.salida, 'w') as archivo:
+        json.dump(informe, archivo, indent=2)
+    print(f"\nResultados guardados en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar) as archivo:
+            comparar(resultados, json.load(archivo))
+
+    if not revisar_arranque(arranque, args.limite_arranque):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
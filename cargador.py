@@ -0,0 +1,100 @@
+"""
+Carga los programas de los métodos como módulos de Python.
+
+Los archivos se llaman "Método de Euler.py", etc. (con espacios y acentos), así que
+no se pueden importar con un `import` normal. Este módulo los carga por su ruta y
+los registra con un nombre corto para que otros programas (benchmarks, lotes, ...)
+puedan usar sus funciones sin abrir la interfaz ni pedir datos por teclado.
+
+También reúne lo que esos programas comparten para correr sin pantalla: resolver
+una EDO con Euler o RK4 a partir de textos, medir el error contra la solución
+exacta y silenciar lo que imprimen los métodos.
+"""
+
+import contextlib
+import importlib.util
+import io
+import os
+import sys
+
+import numpy as np
+
+_DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+# Nombre corto -> (nombre del módulo, archivo del programa)
+METODOS = {
+    'euler': ('metodo_euler', 'Método de Euler.py'),
+    'rk4': ('metodo_rk4', 'Método de Runge-Kutta de orden 4.py'),
+    'newton': ('metodo_newton', 'Método de Newton-Raphson.py'),
+}
+
+
+def cargar_metodo(nombre):
+    """
+    Devuelve el módulo del método pedido ('euler', 'rk4' o 'newton').
+    Solo se carga la primera vez; después se reutiliza el mismo módulo.
+    """
+    if nombre not in METODOS:
+        raise ValueError(f"Método desconocido: {nombre}. Opciones: {', '.join(METODOS)}")
+    modulo, archivo = METODOS[nombre]
+    if modulo in sys.modules:
+        return sys.modules[modulo]
+
+    # Los programas importan motor_expresiones, que está en esta misma carpeta
+    if _DIRECTORIO not in sys.path:
+        sys.path.insert(0, _DIRECTORIO)
+
+    spec = importlib.util.spec_from_file_location(modulo, os.path.join(_DIRECTORIO, archivo))
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[modulo] = mod
+    try:
+        spec.loader.exec_module(mod)
+    except BaseException:
+        del sys.modules[modulo]
+        raise
+    return mod
+
+
+def sin_ventanas():
+    """
+    Hace que matplotlib no intente abrir ventanas (backend Agg), salvo que el
+    usuario haya elegido otro en MPLBACKEND. Los métodos importan matplotlib solo
+    al graficar, así que basta con llamarla antes de usarlos.
+    """
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+
+
+def silencio():
+    """Contexto que descarta lo que imprimen los métodos (progreso, tablas, avisos)."""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def resolver_edo(metodo, f_str, x0, y0, h, x_final):
+    """
+    Resuelve dy/dx = f(x, y) con 'euler' o 'rk4' a partir del texto de f.
+    Devuelve (x, y) con y de forma (puntos,) o (puntos, n) para un sistema.
+    """
+    modulo = cargar_metodo(metodo)
+    if metodo == 'euler':
+        f = modulo.create_function(f_str, ['x', 'y'])
+        if f is None:
+            raise ValueError(f"Expresión no válida: {f_str}")
+        return modulo.metodo_euler(f, x0, y0, h, x_final, mostrar_tabla=False)
+    if metodo == 'rk4':
+        resultado = modulo.RungeKuttaSolver(modulo.parse_math_function(f_str)).solve(x0, y0, h, x_final)
+        return resultado.x, resultado.y
+    raise ValueError(f"Método no válido para una EDO: {metodo}. Opciones: euler, rk4")
+
+
+def error_contra_exacta(exacta_str, x, y):
+    """
+    Error absoluto de y frente a la solución exacta (texto en x) en cada nodo,
+    con forma (puntos, componentes). La exacta se evalúa con evaluar_analitica de
+    Euler, que admite sistemas con alguna componente constante (por ejemplo "[1, x]").
+    """
+    euler = cargar_metodo('euler')
+    from motor_expresiones import compilar_expresion  # cargar_metodo ya dejó la carpeta en sys.path
+
+    x = np.asarray(x, dtype=float)
+    y_exacta = euler.evaluar_analitica(compilar_expresion(exacta_str, ('x',)), x)
+    return np.abs(np.asarray(y, dtype=float).reshape(len(x), -1) - np.reshape(y_exacta, (len(x), -1)))
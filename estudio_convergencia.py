@@ -0,0 +1,144 @@
+"""
+Estudio de convergencia: resuelve la misma EDO con varios tamaños de paso h
+y compara cada resultado con la solución exacta.
+
+Las corridas son independientes, así que se reparten entre los núcleos del
+procesador. El resultado es una tabla error-vs-h con el orden de precisión
+observado (Euler debería dar ~1 y RK4 ~4) y el mayor h que cumple un error
+objetivo, para no usar pasos más pequeños de lo necesario:
+
+    python estudio_convergencia.py --metodo rk4 --f="-2*y" --exacta "exp(-2*x)" \\
+        --y0 1 --x-final 5 --h 0.5 0.25 0.1 0.05 0.01 --objetivo 1e-6
+"""
+
+import argparse
+import math
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from cargador import error_contra_exacta, resolver_edo, silencio, sin_ventanas
+
+# Los procesos de trabajo no deben intentar abrir ventanas de matplotlib
+sin_ventanas()
+
+
+class EstudioConvergencia(NamedTuple):
+    """Resultado de estudio_convergencia()."""
+    filas: list                     # Una fila por h (de mayor a menor): h, pasos, error, orden
+    orden_observado: float          # Pendiente del ajuste log(error) vs log(h)
+    h_recomendado: Optional[float]  # Mayor h probado con error <= objetivo (o None)
+    h_estimado: Optional[float]     # h que predice el ajuste error ≈ C·h^p para el objetivo
+
+
+def _resolver(metodo, f_str, exacta_str, x0, y0, x_final, h):
+    """
+    Resuelve una vez con paso h y devuelve (h, pasos, error máximo en los nodos).
+    Recibe textos en lugar de funciones para poder ejecutarse en otro proceso.
+    """
+    # Los métodos imprimen su progreso; en el estudio solo interesa el resultado
+    with silencio():
+        x, y = resolver_edo(metodo, f_str, x0, y0, h, x_final)
+
+    if len(x) == 0:
+        return h, 0, math.nan
+    return h, len(x) - 1, float(np.max(error_contra_exacta(exacta_str, x, y)))
+
+
+def orden_observado(lista_h, errores):
+    """
+    Pendiente de la recta que mejor ajusta log(error) contra log(h).
+    Si error ≈ C·h^p, la pendiente es p. Devuelve (p, C); ignora errores nulos o NaN.
+    """
+    h = np.asarray(lista_h, dtype=float)
+    e = np.asarray(errores, dtype=float)
+    validos = np.isfinite(e) & (e > 0)
+    if np.count_nonzero(validos) < 2:
+        return math.nan, math.nan
+    p, log_c = np.polyfit(np.log(h[validos]), np.log(e[validos]), 1)
+    return float(p), float(np.exp(log_c))
+
+
+def estudio_convergencia(metodo, f_str, exacta_str, x0, y0, x_final, lista_h,
+                         objetivo=None, procesos=None):
+    """
+    Resuelve dy/dx = f(x, y) con `metodo` ('euler' o 'rk4') para cada h de `lista_h`
+    y compara con la solución exacta `exacta_str` (texto en x, como g(x) en Euler).
+    Las corridas se reparten en `procesos` procesos (None = todos los núcleos,
+    1 = sin procesos extra). Si se da `objetivo`, recomienda el mayor h que lo cumple.
+    """
+    if metodo not in ('euler', 'rk4'):
+        raise ValueError(f"Método no válido para el estudio: {metodo}. Opciones: euler, rk4")
+    lista_h = sorted({float(h) for h in lista_h}, reverse=True)
+    argumentos = [(metodo, f_str, exacta_str, x0, y0, x_final, h) for h in lista_h]
+
+    if procesos == 1:
+        corridas = [_resolver(*a) for a in argumentos]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as executor:
+            corridas = list(executor.map(_resolver, *zip(*argumentos)))
+
+    # Orden entre cada par de h consecutivos: log(e1/e2) / log(h1/h2)
+    filas = []
+    for i, (h, pasos, error) in enumerate(corridas):
+        orden = math.nan
+        if i > 0:
+            h_ant, _, e_ant = corridas[i - 1]
+            if error > 0 and e_ant > 0:
+                orden = math.log(e_ant / error) / math.log(h_ant / h)
+        filas.append({'h': h, 'pasos': pasos, 'error': error, 'orden': orden})
+
+    p, c = orden_observado([f['h'] for f in filas], [f['error'] for f in filas])
+
+    h_recomendado = h_estimado = None
+    if objetivo is not None:
+        cumplen = [f['h'] for f in filas if f['error'] <= objetivo]
+        h_recomendado = max(cumplen) if cumplen else None
+        if p > 0 and c > 0:
+            h_estimado = (objetivo / c) ** (1.0 / p)
+
+    return EstudioConvergencia(filas, p, h_recomendado, h_estimado)
+
+
+def imprimir_estudio(estudio, objetivo=None):
+    """Muestra la tabla error-vs-h y la recomendación en la terminal."""
+    print(f"\n{'h':>12} {'Pasos':>9} {'Error máx.':>14} {'Orden':>8}")
+    print("-" * 46)
+    for fila in estudio.filas:
+        orden = "" if math.isnan(fila['orden']) else f"{fila['orden']:.3f}"
+        print(f"{fila['h']:>12.6g} {fila['pasos']:>9} {fila['error']:>14.6e} {orden:>8}")
+    print(f"\nOrden observado (ajuste log-log): {estudio.orden_observado:.3f}")
+
+    if objetivo is not None:
+        if estudio.h_recomendado is not None:
+            print(f"Mayor h probado con error <= {objetivo:g}: {estudio.h_recomendado:g}")
+        else:
+            print(f"Ningún h probado alcanza el error {objetivo:g}.")
+        if estudio.h_estimado is not None:
+            print(f"h estimado por el ajuste para error {objetivo:g}: {estudio.h_estimado:.6g}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--metodo', choices=['euler', 'rk4'], default='rk4')
+    parser.add_argument('--f', required=True, help="dy/dx = f(x, y)")
+    parser.add_argument('--exacta', required=True, help="solución exacta y(x)")
+    parser.add_argument('--x0', type=float, default=0.0)
+    parser.add_argument('--y0', default='1', help="valor inicial (separado por comas para sistemas)")
+    parser.add_argument('--x-final', type=float, required=True)
+    parser.add_argument('--h', type=float, nargs='+', required=True, help="tamaños de paso a probar")
+    parser.add_argument('--objetivo', type=float, help="error máximo aceptable")
+    parser.add_argument('--procesos', type=int, help="procesos en paralelo (por omisión, todos los núcleos)")
+    args = parser.parse_args(argv)
+
+    valores = [float(v) for v in args.y0.split(',')]
+    y0 = valores[0] if len(valores) == 1 else np.array(valores)
+
+    estudio = estudio_convergencia(args.metodo, args.f, args.exacta, args.x0, y0, args.x_final,
+                                   args.h, args.objetivo, args.procesos)
+    imprimir_estudio(estudio, args.objetivo)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Utilidades de gráficas compartidas por Euler y RK4.
+
+- Reducción de puntos: con millones de pasos, matplotlib tarda minutos en dibujar
+  cada marcador. Por encima de MAX_PUNTOS se conserva, en cada tramo de la curva,
+  solo el punto más bajo y el más alto (min/max por tramo), que es lo que se ve
+  en pantalla, así que la forma de la curva no cambia.
+- Modo sin pantalla: si se da una ruta, la gráfica se dibuja en una figura suelta
+  con su propio lienzo Agg y se guarda en un archivo (PNG, SVG, ... según la
+  extensión) en lugar de abrir una ventana. No cambia el backend global, así que
+  las gráficas en pantalla posteriores siguen funcionando. Sirve para trabajos
+  por lotes en un servidor.
+
+matplotlib solo se importa dentro de las funciones que dibujan, porque tarda en
+cargarse y los cálculos sin gráficas no lo necesitan.
+"""
+
+import numpy as np
+
+# A partir de cuántos puntos se reduce la curva antes de dibujarla
+MAX_PUNTOS = 5000
+
+
+def indices_reducidos(y, max_puntos=MAX_PUNTOS):
+    """
+    Índices de los puntos que se dibujan: todos si son pocos; si no, el mínimo
+    y el máximo de cada tramo (y el primero y el último). `y` puede ser 1-D o
+    (n, componentes); en ese caso se juntan los índices de todas las componentes.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= max_puntos:
+        return np.arange(n)
+
+    columnas = y.reshape(n, -1)
+    n_tramos = max(1, max_puntos // 2)
+    tam = -(-n // n_tramos)  # División hacia arriba
+    indices = [np.array([0, n - 1])]
+    for col in columnas.T:
+        # Rellenamos el último tramo y acomodamos los valores en (tramos, tam)
+        relleno = np.full(n_tramos * tam, np.nan)
+        relleno[:n] = col
+        tramos = relleno.reshape(n_tramos, tam)
+        base = np.arange(n_tramos) * tam
+        # Los NaN no deben ganar ni como mínimo ni como máximo
+        indices.append(base + np.argmin(np.where(np.isnan(tramos), np.inf, tramos), axis=1))
+        indices.append(base + np.argmax(np.where(np.isnan(tramos), -np.inf, tramos), axis=1))
+
+    indices = np.unique(np.concatenate(indices))
+    return indices[indices < n]
+
+
+def nueva_figura(ruta=None, figsize=(10, 6)):
+    """
+    Crea la figura y sus ejes y devuelve (fig, ax). Sin `ruta` se crea con pyplot
+    (para mostrarla en una ventana); con `ruta`, como Figure suelta con un lienzo
+    Agg propio, que se dibuja sin pantalla y sin tocar el backend de pyplot.
+    """
+    if ruta is None:
+        import matplotlib.pyplot as plt
+        return plt.subplots(figsize=figsize)
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot()
+
+
+def mostrar_o_guardar(fig, ruta=None):
+    """Muestra la figura en pantalla o, si se da `ruta`, la guarda en ese archivo."""
+    if ruta is None:
+        import matplotlib.pyplot as plt
+        plt.show()
+        return
+    fig.savefig(ruta, dpi=150, bbox_inches='tight')
+    print(f"Gráfica guardada en {ruta}")
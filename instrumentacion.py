@@ -0,0 +1,63 @@
+"""
+Contadores y cronómetros opcionales para medir el costo de cada método.
+
+Se crea un objeto Instrumentacion y se pasa al método (metodo_euler, RungeKuttaSolver,
+newton_raphson, ...). Al terminar, el objeto tiene:
+- contadores: cuántas veces se evaluó f (y f' en Newton-Raphson, como 'f_prime';
+  'f_fusionada' si f y f' se evalúan juntas).
+- tiempos: segundos acumulados en cada fase ('parsear', 'integrar' o 'iterar',
+  'tabla', 'graficar').
+- por_paso: función opcional que el método llama en cada paso.
+
+Si no se pasa ninguna Instrumentacion, los métodos no envuelven f ni miden nada,
+así que no cuesta nada tenerla desactivada.
+"""
+
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+
+class Instrumentacion:
+    """Acumula evaluaciones de funciones, tiempos por fase y un aviso opcional por paso."""
+
+    def __init__(self, por_paso=None):
+        self.contadores = {}
+        self.tiempos = {}
+        self.por_paso = por_paso
+
+    def contar(self, funcion, nombre):
+        """Devuelve `funcion` envuelta para que cada llamada sume 1 en contadores[nombre]."""
+        self.contadores.setdefault(nombre, 0)
+
+        @wraps(funcion)
+        def contada(*args, **kwargs):
+            self.contadores[nombre] += 1
+            return funcion(*args, **kwargs)
+        return contada
+
+    @contextmanager
+    def fase(self, nombre):
+        """Bloque `with` que suma su duración en tiempos[nombre]."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.tiempos[nombre] = self.tiempos.get(nombre, 0.0) + time.perf_counter() - inicio
+
+    def resumen(self):
+        """Diccionario con contadores y tiempos (por ejemplo para guardarlo en JSON)."""
+        return {'contadores': dict(self.contadores), 'tiempos': dict(self.tiempos)}
+
+    def __repr__(self):
+        return f"Instrumentacion(contadores={self.contadores}, tiempos={self.tiempos})"
+
+
+def fase(instrumentacion, nombre):
+    """Como Instrumentacion.fase, pero no hace nada si `instrumentacion` es None."""
+    return nullcontext() if instrumentacion is None else instrumentacion.fase(nombre)
+
+
+def contar(instrumentacion, funcion, nombre):
+    """Como Instrumentacion.contar, pero devuelve `funcion` intacta si `instrumentacion` es None."""
+    return funcion if instrumentacion is None else instrumentacion.contar(funcion, nombre)
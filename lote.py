@@ -0,0 +1,227 @@
+"""
+Resuelve muchos problemas sin interfaz ni preguntas por teclado.
+
+Lee una lista de problemas de un archivo JSON o CSV, los reparte entre varios
+procesos y guarda todas las trayectorias (o iteraciones) en un solo archivo
+CSV o Parquet, más un resumen con una fila por problema:
+
+    python lote.py problemas.json --salida resultados.csv
+    python lote.py problemas.csv --salida resultados.parquet --procesos 4
+
+Campos de cada problema (los que no se usan se pueden omitir):
+- id: nombre del problema (por omisión, su número de fila).
+- metodo: 'euler', 'rk4' o 'newton'.
+- EDOs: f (dy/dx), x0, y0 (número o "a,b,..." para sistemas), h, x_final y,
+  opcionalmente, exacta (solución y(x) para calcular errores).
+- Raíces: f, x0, tol, max_iter y metodo_raiz (Newton-Raphson, Secante, Halley,
+  Brent o Newton-Bisección; por omisión Newton-Raphson).
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from cargador import cargar_metodo, error_contra_exacta, resolver_edo, silencio, sin_ventanas
+from motor_expresiones import compilar_expresion
+
+# Los procesos de trabajo no deben intentar abrir ventanas de matplotlib
+sin_ventanas()
+
+METODOS_LOTE = ('euler', 'rk4', 'newton')
+
+# Campos del CSV que se leen como números; los demás (id, f, exacta, y0, ...) quedan como texto
+CAMPOS_NUMERICOS = ('x0', 'h', 'x_final', 'tol', 'max_iter')
+
+
+# ===== LECTURA DE PROBLEMAS =====
+
+def _numero(valor):
+    """Convierte a float los textos numéricos del CSV; deja los demás como están."""
+    if not isinstance(valor, str):
+        return valor
+    try:
+        return float(valor)
+    except ValueError:
+        return valor
+
+def _vector(valor):
+    """y0 puede ser un número, una lista o un texto "a,b,..." (sistemas)."""
+    if isinstance(valor, str):
+        valor = [float(v) for v in valor.split(',')]
+    if isinstance(valor, (list, tuple)):
+        return valor[0] if len(valor) == 1 else np.array(valor, dtype=float)
+    return float(valor)
+
+def leer_problemas(ruta):
+    """Lee la lista de problemas de un archivo .json (lista de objetos) o .csv (una fila por problema)."""
+    if ruta.lower().endswith('.json'):
+        with open(ruta) as archivo:
+            datos = json.load(archivo)
+        problemas = datos['problemas'] if isinstance(datos, dict) else datos
+    else:
+        with open(ruta, newline='') as archivo:
+            # Las celdas vacías del CSV equivalen a campos omitidos
+            problemas = [{k: _numero(v) if k in CAMPOS_NUMERICOS else v
+                          for k, v in fila.items() if v not in (None, '')}
+                         for fila in csv.DictReader(archivo)]
+
+    for i, problema in enumerate(problemas):
+        problema.setdefault('id', str(i + 1))
+        problema['id'] = str(problema['id'])
+        # En JSON una EDO constante puede venir como número ("f": 2)
+        for campo in ('f', 'exacta'):
+            if campo in problema:
+                problema[campo] = str(problema[campo])
+        if problema.get('metodo') not in METODOS_LOTE:
+            raise ValueError(f"Problema {problema['id']}: metodo debe ser uno de {', '.join(METODOS_LOTE)}")
+    return problemas
+
+
+# ===== RESOLUCIÓN (EN CADA PROCESO) =====
+
+def _resolver_edo(problema):
+    """Resuelve una EDO con Euler o RK4. Devuelve (tabla, resumen)."""
+    x, y = resolver_edo(problema['metodo'], problema['f'], float(problema['x0']), _vector(problema['y0']),
+                        float(problema['h']), float(problema['x_final']))
+    if len(x) == 0:
+        raise ValueError("El método no produjo resultados (revisa h y el intervalo).")
+
+    # Una columna por componente: y para ecuaciones, y[0], y[1], ... para sistemas
+    y = np.asarray(y, dtype=float)
+    columnas_y = ['y'] if y.ndim == 1 else [f'y[{j}]' for j in range(y.shape[1])]
+    tabla = {'paso': np.arange(len(x)), 'x': x}
+    tabla.update(zip(columnas_y, y.reshape(len(x), -1).T))
+    resumen = {'pasos': len(x) - 1, 'x_final': float(x[-1]),
+               'y_final': ', '.join(f"{v:.10g}" for v in np.atleast_1d(y[-1]))}
+
+    if problema.get('exacta'):
+        error = error_contra_exacta(problema['exacta'], x, y)
+        tabla['error_abs'] = error.max(axis=1)
+        resumen['error_max'] = float(error.max())
+    return tabla, resumen
+
+def _resolver_raiz(problema):
+    """Busca una raíz con el módulo de Newton-Raphson (sin abrir la ventana)."""
+    modulo = cargar_metodo('newton')
+    metodo = problema.get('metodo_raiz', 'Newton-Raphson')
+    if metodo not in modulo.METODOS_RAIZ:
+        raise ValueError(f"metodo_raiz desconocido: {metodo}")
+    func_str = problema['f']
+
+    if modulo.METODOS_RAIZ[metodo] == 'sin derivada':
+        f, f_prime = compilar_expresion(func_str, ('x',)), None
+    else:
+        f, f_prime, _, _ = modulo._parsear_funcion(func_str.strip())
+    raiz, iteraciones = modulo.buscar_raiz(metodo, func_str, f, f_prime, float(problema['x0']),
+                                           float(problema.get('tol', 1e-6)),
+                                           int(float(problema.get('max_iter', 100))))
+
+    tabla = {'paso': [it['iter'] for it in iteraciones]}
+    for clave in ('x', 'fx', 'fpx', 'x_new', 'error'):
+        tabla[clave] = [it[clave] for it in iteraciones]
+    resumen = {'pasos': len(iteraciones), 'raiz': float(raiz), 'f_raiz': float(f(raiz)),
+               'metodo_raiz': metodo}
+    return tabla, resumen
+
+def resolver_problema(problema):
+    """
+    Resuelve un problema y devuelve (tabla, resumen). Nunca lanza excepciones:
+    si algo falla, la tabla queda vacía y el resumen trae estado 'error' y el mensaje.
+    """
+    resumen = {'id': problema['id'], 'metodo': problema['metodo'], 'estado': 'ok', 'mensaje': ''}
+    inicio = time.perf_counter()
+    try:
+        # Los métodos imprimen su progreso; en un lote solo interesan los resultados
+        with silencio():
+            if problema['metodo'] == 'newton':
+                tabla, datos = _resolver_raiz(problema)
+            else:
+                tabla, datos = _resolver_edo(problema)
+        resumen.update(datos)
+    except Exception as e:
+        tabla = {}
+        resumen.update(estado='error', mensaje=str(e))
+    resumen['tiempo_s'] = time.perf_counter() - inicio
+    return tabla, resumen
+
+
+# ===== EJECUCIÓN Y SALIDA =====
+
+def ejecutar_lote(problemas, procesos=None):
+    """
+    Resuelve todos los problemas repartidos en `procesos` procesos (None = todos
+    los núcleos, 1 = en este mismo proceso). Devuelve (resultados, resumen) como
+    DataFrames: resultados en formato largo (columna id) y una fila de resumen por problema.
+    """
+    if procesos == 1:
+        salidas = [resolver_problema(p) for p in problemas]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as executor:
+            salidas = list(executor.map(resolver_problema, problemas, chunksize=4))
+
+    tablas = [pd.DataFrame(tabla).assign(id=resumen['id'], metodo=resumen['metodo'])
+              for tabla, resumen in salidas if tabla]
+    resultados = pd.concat(tablas, ignore_index=True) if tablas else pd.DataFrame()
+    if not resultados.empty:
+        # id y metodo primero; el resto en el orden en que aparecieron
+        resultados = resultados[['id', 'metodo'] + [c for c in resultados.columns if c not in ('id', 'metodo')]]
+    resumen = pd.DataFrame([resumen for _, resumen in salidas])
+    return resultados, resumen
+
+def guardar_tabla(tabla, ruta):
+    """Guarda un DataFrame como CSV o Parquet según la extensión de `ruta`."""
+    if ruta.lower().endswith('.parquet'):
+        try:
+            tabla.to_parquet(ruta, index=False)
+        except ImportError as e:
+            raise SystemExit(f"Para escribir Parquet hace falta pyarrow o fastparquet ({e}).")
+    else:
+        tabla.to_csv(ruta, index=False)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('problemas', help="archivo .json o .csv con la lista de problemas")
+    parser.add_argument('--salida', default='resultados.csv', help="archivo de resultados (.csv o .parquet)")
+    parser.add_argument('--resumen', help="archivo del resumen por problema (por omisión, <salida>_resumen.<ext>)")
+    parser.add_argument('--procesos', type=int, help="procesos en paralelo (por omisión, todos los núcleos)")
+    args = parser.parse_args(argv)
+
+    problemas = leer_problemas(args.problemas)
+    inicio = time.perf_counter()
+    resultados, resumen = ejecutar_lote(problemas, args.procesos)
+    total = time.perf_counter() - inicio
+
+    base, extension = os.path.splitext(args.salida)
+    ruta_resumen = args.resumen or f"{base}_resumen{extension}"
+    guardar_tabla(resultados, args.salida)
+    guardar_tabla(resumen, ruta_resumen)
+
+    # Resumen en la terminal
+    print(f"{'Id':<12} {'Método':<8} {'Estado':<7} {'Pasos':>8} {'Tiempo (s)':>11}  Detalle")
+    print("-" * 78)
+    for fila in resumen.to_dict('records'):
+        if fila['estado'] != 'ok':
+            detalle = fila['mensaje']
+        elif fila['metodo'] == 'newton':
+            detalle = f"raíz = {fila['raiz']:.10g} ({fila['metodo_raiz']})"
+        else:
+            detalle = f"y({fila['x_final']:.6g}) = {fila['y_final']}"
+            if not pd.isna(fila.get('error_max', np.nan)):
+                detalle += f", error máx. {fila['error_max']:.2e}"
+        pasos = '' if pd.isna(fila.get('pasos', np.nan)) else int(fila['pasos'])
+        print(f"{fila['id']:<12} {fila['metodo']:<8} {fila['estado']:<7} {pasos:>8} "
+              f"{fila['tiempo_s']:>11.4f}  {detalle}")
+
+    errores = int((resumen['estado'] != 'ok').sum())
+    print(f"\n{len(problemas)} problemas en {total:.2f} s ({errores} con error).")
+    print(f"Resultados en {args.salida}; resumen en {ruta_resumen}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Motor de expresiones compartido por los tres métodos (Euler, RK4 y Newton-Raphson).
+
+Convierte textos como "x**2 - math.sin(y)" en funciones de Python de forma segura:
+el texto se analiza con el módulo `ast` y solo se aceptan operaciones aritméticas,
+llamadas a funciones matemáticas conocidas, listas (para sistemas) e índices como y[0].
+La expresión ya validada se compila una sola vez y se guarda en una memoria (caché)
+por texto, así que pedir la misma fórmula otra vez no vuelve a analizar nada.
+
+Cada expresión se compila en dos versiones que aceptan la misma sintaxis:
+- escalar: usa el módulo `math`, lo más rápido para evaluar un número a la vez.
+- vectorial: usa NumPy, acepta arreglos completos de valores.
+"""
+
+import ast
+import math
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Callable, NamedTuple
+
+import numpy as np
+
+# ===== NOMBRES PERMITIDOS =====
+# Lista blanca explícita: solo estas funciones y constantes se pueden usar, sueltas
+# (sin, pi) o como atributo de math o np (math.sin, np.sin). Cualquier otro
+# atributo (np.savetxt, np.load, ...) se rechaza, aunque exista en el módulo.
+
+FUNCIONES = tuple(nombre for nombre in (
+    "sin", "cos", "tan", "asin", "acos", "atan", "atan2",
+    "sinh", "cosh", "tanh", "asinh", "acosh", "atanh",
+    "exp", "expm1", "log", "log2", "log10", "log1p", "sqrt", "cbrt", "pow", "hypot",
+    "fabs", "floor", "ceil", "trunc", "fmod", "copysign", "degrees", "radians",
+    "erf", "erfc", "gamma", "lgamma",
+) if hasattr(math, nombre))  # cbrt solo existe desde Python 3.11
+
+CONSTANTES = ("pi", "e", "tau", "inf", "nan")
+
+# Funciones de `math` cuyo nombre en NumPy es distinto
+_ALIAS_NUMPY = {
+    "asin": "arcsin", "acos": "arccos", "atan": "arctan", "atan2": "arctan2",
+    "asinh": "arcsinh", "acosh": "arccosh", "atanh": "arctanh", "pow": "power",
+}
+
+
+def _version_numpy(nombre: str, valor):
+    """Equivalente vectorial de math.<nombre>: la función de NumPy o, si no existe, np.vectorize."""
+    if not callable(valor):
+        return valor  # Constantes como pi, e, inf
+    if nombre == "log":
+        # math.log acepta una base; en np.log el segundo argumento sería la salida
+        return lambda a, base=None: np.log(a) if base is None else np.log(a) / np.log(base)
+    equivalente = getattr(np, _ALIAS_NUMPY.get(nombre, nombre), None)
+    if isinstance(equivalente, np.ufunc):
+        return equivalente
+    return np.vectorize(valor, otypes=[float])
+
+
+_NOMBRES_MATH = {k: getattr(math, k) for k in FUNCIONES + CONSTANTES}
+_MATH_VECTORIAL = {k: _version_numpy(k, v) for k, v in _NOMBRES_MATH.items()}
+
+# Nombres que se aceptan como np.<nombre>: los mismos que en math, más los de
+# NumPy (arcsin, power, abs, ...), que apuntan a la misma función
+_NOMBRES_NP = {k: k for k in _NOMBRES_MATH}
+_NOMBRES_NP.update({v: k for k, v in _ALIAS_NUMPY.items()})
+_NOMBRES_NP.update({"abs": "abs", "absolute": "abs"})
+
+
+def _espacio(funciones, abs_):
+    """Nombres sueltos más `math` y `np` con solo las funciones de la lista blanca."""
+    nombres = dict(funciones, abs=abs_)
+    nombres["np"] = SimpleNamespace(**{k: nombres[v] for k, v in _NOMBRES_NP.items()})
+    nombres["math"] = SimpleNamespace(**funciones)
+    return nombres
+
+
+# Espacio de nombres de la versión escalar: las funciones de `math` (más abs)
+NOMBRES_ESCALAR = _espacio(_NOMBRES_MATH, abs)
+
+# Espacio de nombres de la versión vectorial: los mismos nombres, con NumPy detrás
+NOMBRES_VECTORIAL = _espacio(_MATH_VECTORIAL, np.abs)
+
+# Atributos que se pueden usar de cada módulo (math.sin, np.arcsin, ...)
+_ATRIBUTOS = {"math": frozenset(_NOMBRES_MATH), "np": frozenset(_NOMBRES_NP)}
+
+# Nodos del árbol sintáctico (AST) permitidos: aritmética, llamadas, listas e índices
+_NODOS_PERMITIDOS = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Load,
+    ast.Constant, ast.Attribute, ast.Subscript, ast.List, ast.Tuple,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.UAdd, ast.USub,
+)
+
+
+# ===== VALIDACIÓN Y COMPILACIÓN =====
+
+class ExpresionCompilada(NamedTuple):
+    """
+    Resultado de compilar un texto: la versión escalar y la vectorial.
+    Llamarla directamente usa la vectorial (acepta números y arreglos); los
+    bucles que evalúan un número a la vez pueden usar `.escalar`, que es más rápida.
+    """
+    texto: str
+    escalar: Callable
+    vectorial: Callable
+
+    def __call__(self, *args, **kwargs):
+        return self.vectorial(*args, **kwargs)
+
+
+def normalizar(texto: str) -> str:
+    """Sintaxis común a todos los métodos: quita espacios sobrantes y acepta ^ como potencia."""
+    return texto.strip().replace('^', '**')
+
+
+def validar(arbol: ast.AST, texto: str, nombres_extra=()) -> None:
+    """Recorre el AST y lanza ValueError ante cualquier construcción fuera de la lista blanca."""
+    permitidos = set(NOMBRES_ESCALAR) | set(nombres_extra)
+    for nodo in ast.walk(arbol):
+        if not isinstance(nodo, _NODOS_PERMITIDOS):
+            raise ValueError(f"Construcción no permitida en '{texto}': {type(nodo).__name__}")
+        if isinstance(nodo, ast.Name) and nodo.id not in permitidos:
+            raise ValueError(f"Nombre desconocido en '{texto}': {nodo.id}")
+        if isinstance(nodo, ast.Attribute):
+            # Solo las funciones y constantes de la lista blanca, como math.sin o np.pi
+            if not (isinstance(nodo.value, ast.Name) and nodo.attr in _ATRIBUTOS.get(nodo.value.id, ())):
+                raise ValueError(f"Atributo no permitido en '{texto}': {nodo.attr}")
+
+
+@lru_cache(maxsize=512)
+def _compilar(texto: str, variables: tuple, parametros: tuple) -> ExpresionCompilada:
+    for nombre in variables + parametros:
+        if not nombre.isidentifier() or nombre in NOMBRES_ESCALAR:
+            raise ValueError(f"Nombre de variable no válido: {nombre}")
+
+    cuerpo = ast.parse(texto, mode='eval')
+    validar(cuerpo, texto, variables + parametros)
+
+    # Envolvemos la expresión en `lambda x, y=0, ..., *, <parametros>: <expr>`:
+    # la primera variable es obligatoria y las demás valen 0 si no se pasan
+    funcion = ast.Expression(body=ast.Lambda(
+        args=ast.arguments(
+            posonlyargs=[], args=[ast.arg(arg=v) for v in variables],
+            vararg=None, kwonlyargs=[ast.arg(arg=p) for p in parametros],
+            kw_defaults=[None] * len(parametros), kwarg=None,
+            defaults=[ast.Constant(value=0)] * (len(variables) - 1)),
+        body=cuerpo.body))
+    ast.fix_missing_locations(funcion)
+    codigo = compile(funcion, f"<expresión: {texto}>", 'eval')
+
+    return ExpresionCompilada(
+        texto=texto,
+        escalar=eval(codigo, {"__builtins__": {}, **NOMBRES_ESCALAR}),
+        vectorial=eval(codigo, {"__builtins__": {}, **NOMBRES_VECTORIAL}),
+    )
+
+
+def version_escalar(funcion: Callable) -> Callable:
+    """La versión escalar de una ExpresionCompilada; cualquier otra función se devuelve igual."""
+    return funcion.escalar if isinstance(funcion, ExpresionCompilada) else funcion
+
+
+def compilar_expresion(texto: str, variables=('x', 'y'), parametros=()) -> ExpresionCompilada:
+    """
+    Valida y compila `texto` como función de `variables` (posicionales) y
+    `parametros` (por nombre). El resultado se guarda en caché: compilar el
+    mismo texto con las mismas variables devuelve el mismo objeto.
+    Lanza ValueError (o SyntaxError) si la expresión no es válida.
+    """
+    return _compilar(normalizar(texto), tuple(variables), tuple(parametros))
+
+
+@lru_cache(maxsize=None)
+def nombres_sympy() -> dict:
+    """
+    Los mismos nombres de la lista blanca (sueltos y como math.<f> o np.<f>) con
+    sus equivalentes de sympy, para usarlos como `locals` de sympy.sympify.
+    Así una expresión que el motor acepta también se puede derivar.
+    sympy solo se importa al llamar a esta función.
+    """
+    import sympy as sp
+    simbolicas = {
+        "sin": sp.sin, "cos": sp.cos, "tan": sp.tan,
+        "asin": sp.asin, "acos": sp.acos, "atan": sp.atan, "atan2": sp.atan2,
+        "sinh": sp.sinh, "cosh": sp.cosh, "tanh": sp.tanh,
+        "asinh": sp.asinh, "acosh": sp.acosh, "atanh": sp.atanh,
+        "exp": sp.exp, "expm1": lambda a: sp.exp(a) - 1,
+        "log": lambda a, base=None: sp.log(a) if base is None else sp.log(a, base),
+        "log2": lambda a: sp.log(a, 2), "log10": lambda a: sp.log(a, 10),
+        "log1p": lambda a: sp.log(1 + a), "sqrt": sp.sqrt, "cbrt": sp.cbrt,
+        "pow": sp.Pow, "hypot": lambda a, b: sp.sqrt(a**2 + b**2),
+        "fabs": sp.Abs, "floor": sp.floor, "ceil": sp.ceiling,
+        "trunc": lambda a: sp.sign(a) * sp.floor(sp.Abs(a)), "fmod": sp.Mod,
+        "copysign": lambda a, b: sp.Abs(a) * sp.sign(b),
+        "degrees": lambda a: a * 180 / sp.pi, "radians": lambda a: a * sp.pi / 180,
+        "erf": sp.erf, "erfc": sp.erfc, "gamma": sp.gamma, "lgamma": sp.loggamma,
+        "pi": sp.pi, "e": sp.E, "tau": 2 * sp.pi, "inf": sp.oo, "nan": sp.nan,
+    }
+    return _espacio({k: simbolicas[k] for k in _NOMBRES_MATH}, sp.Abs)
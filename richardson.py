@@ -0,0 +1,32 @@
+"""
+Extrapolación de Richardson compartida por Euler y RK4.
+
+Si un método de orden p se resuelve con pasos h, h/2, h/4, ..., el error de cada
+solución se comporta como C1·h^p + C2·h^(p+1) + ... Combinando las soluciones
+en los mismos puntos x se cancelan esos términos uno a uno (tabla de Richardson)
+y se obtiene una estimación de orden p + niveles - 1, junto con una estimación
+(conservadora) de su error: la diferencia entre las dos últimas columnas de la tabla.
+"""
+
+import numpy as np
+
+
+def extrapolar(aproximaciones, orden, razon=2):
+    """
+    Combina `aproximaciones` (arreglos con los mismos puntos, de h más grande a
+    más pequeño, cada uno con el paso dividido entre `razon`) de un método de
+    orden `orden`. Devuelve (mejor, error_estimado), ambos con la forma de las
+    aproximaciones; con una sola aproximación el error estimado es NaN.
+    """
+    fila = [np.asarray(aproximaciones[0], dtype=float)]
+    for i in range(1, len(aproximaciones)):
+        # Nueva fila de la tabla: cada columna j elimina el término h^(orden + j - 1)
+        nueva = [np.asarray(aproximaciones[i], dtype=float)]
+        for j in range(1, i + 1):
+            factor = razon ** (orden + j - 1) - 1.0
+            nueva.append(nueva[j - 1] + (nueva[j - 1] - fila[j - 1]) / factor)
+        fila = nueva
+
+    if len(fila) == 1:
+        return fila[0], np.full_like(fila[0], np.nan)
+    return fila[-1], np.abs(fila[-1] - fila[-2])